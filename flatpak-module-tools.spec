@@ -28,11 +28,14 @@ BuildRequires: libmodulemd
 BuildRequires: librsvg2
 BuildRequires: ostree
 BuildRequires: python3-click
+BuildRequires: python3-createrepo_c
 BuildRequires: python3-gobject-base
 BuildRequires: python3-pytest-cov
+BuildRequires: python3-pytest-xdist
 BuildRequires: python3-jinja2
 BuildRequires: python3-koji
-BuildRequires: python3-networkx
+BuildRequires: python3-lxml
+BuildRequires: python3-networkx >= 3.1
 BuildRequires: python3-pytest
 BuildRequires: python3-requests
 BuildRequires: python3-responses
@@ -43,7 +46,7 @@ BuildRequires: zstd
 Requires: python3-%{srcname} = %{version}-%{release}
 Requires: python3-jinja2
 Requires: python3-koji
-Requires: python3-networkx
+Requires: python3-networkx >= 3.1
 Requires: python3-requests-toolbelt
 # for pkg_resources
 Requires: python3-setuptools
@@ -70,6 +73,7 @@ Requires: libappstream-glib
 Requires: librsvg2
 Requires: ostree
 Requires: python3-click
+Requires: python3-lxml
 Requires: python3-requests
 Requires: python3-rpm
 Requires: python3-yaml
@@ -92,7 +96,7 @@ export SETUPTOOLS_SCM_PRETEND_VERSION=%{project_version}
 
 %check
 # Tests using RPM don't work well inside %%check
-%pytest -k "not test_create_rpm_manifest"
+%pytest -n auto -k "not test_create_rpm_manifest"
 
 
 %install
@@ -6,13 +6,14 @@ from pathlib import Path
 from textwrap import dedent
 from typing import Any, Dict, List, Optional, Union
 from click import ClickException
+import koji
 
 from flatpak_module_tools.package_locator import PackageLocator
 
 from .config import ProfileConfig
 from .container_spec import ContainerSpec, Option
 from .console_logging import Status
-from .koji_utils import KojiRepo
+from .koji_utils import KojiRepo, cached_koji_call, list_image_archives
 from .utils import Arch, RuntimeInfo
 
 
@@ -46,9 +47,15 @@ class BuildContext(ABC):
 
     @property
     @abstractmethod
+    def runtime_build(self) -> Dict:
+        """Result of calling koji getBuild() for the runtime container."""
+        ...
+
+    @cached_property
     def runtime_archive(self) -> Dict:
         """Result of calling koji getArchive() from the archive file for the runtime container."""
-        ...
+        archives = list_image_archives(self.profile, self.runtime_build)
+        return next(a for a in archives if a["extra"]["image"]["arch"] == self.arch.rpm)
 
     @property
     @abstractmethod
@@ -96,8 +103,12 @@ class BuildContext(ABC):
                 rpms = json.load(f)
         else:
             with Status("Listing runtime packages"):
-                session = self.profile.koji_session
-                rpms = session.listRPMs(imageID=self.runtime_archive["id"])
+                image_id = self.runtime_archive["id"]
+                # The contents of an image from a completed build never change
+                if self.runtime_build["state"] == koji.BUILD_STATES["COMPLETE"]:
+                    rpms = cached_koji_call(self.profile, "listRPMs", imageID=image_id, ttl=None)
+                else:
+                    rpms = self.profile.koji_session.listRPMs(imageID=image_id)
 
         return sorted(rpm["name"] for rpm in rpms)
 
@@ -241,7 +252,7 @@ class AutoBuildContext(BuildContext):
         return value
 
     @cached_property
-    def runtime_archive(self):
+    def runtime_build(self):
         session = self.profile.koji_session
         runtime_tag = self._get_container_build_config_extra('flatpak.runtime_tag')
         tagged_builds = session.listTagged(
@@ -252,10 +263,7 @@ class AutoBuildContext(BuildContext):
                 f"Can't find build for {self.flatpak_spec.runtime_name} in {runtime_tag}"
             )
 
-        latest_build = tagged_builds[0]
-
-        archives = session.listArchives(buildID=latest_build["build_id"])
-        return next(a for a in archives if a["extra"]["image"]["arch"] == self.arch.rpm)
+        return tagged_builds[0]
 
     @property
     def runtime_package_repo(self):
@@ -328,13 +336,13 @@ class ManualBuildContext(BuildContext):
         return self._nvr
 
     @cached_property
-    def runtime_archive(self):
+    def runtime_build(self):
         assert self.runtime_nvr
         build = self.profile.koji_session.getBuild(self.runtime_nvr)
-        session = self.profile.koji_session
+        if build is None:
+            raise ClickException(f"Can't find runtime build {self.runtime_nvr}")
 
-        archives = session.listArchives(buildID=build["build_id"])
-        return next(a for a in archives if a["extra"]["image"]["arch"] == self.arch.rpm)
+        return build
 
     @cached_property
     def runtime_package_repo(self):
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cached_property
 import logging
 from pathlib import Path
 import sys
@@ -32,27 +33,28 @@ class Paths:
     _containerspec: Optional[Path] = None
     ignore_missing_local_repo: bool = False
 
+    @cached_property
+    def archdir(self):
+        return self.path / Arch().rpm
+
     @property
     def workdir(self):
-        archdir = self.path / Arch().rpm
-        return archdir / "work"
+        return self.archdir / "work"
 
     @property
     def oci_workdir(self):
-        archdir = self.path / Arch().rpm
-        return archdir / "work/oci"
+        return self.archdir / "work/oci"
 
     @property
     def resultdir(self):
-        archdir = self.path / Arch().rpm
-        return archdir / "result"
+        return self.archdir / "result"
 
     @property
     def local_repo(self):
         if self._local_repo is not None:
             result = self.path / self._local_repo
         else:
-            result = self.path / Path(Arch().rpm) / "rpms"
+            result = self.archdir / "rpms"
 
         if self.ignore_missing_local_repo:
             if not (result / "repodata/repomd.xml").exists():
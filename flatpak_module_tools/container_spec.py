@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, List, Literal, overload, Optional, Union
+from typing import Any, Dict, List, Literal, overload, Optional, Union
 import yaml
 
 from flatpak_module_tools.utils import Arch
@@ -179,11 +179,17 @@ class FlatpakSpec(BaseSpec):
         self.sdk = self._get_str('sdk', None)
         self.tags = self._get_str_list('tags', [])
 
+        self._packages_by_arch: Dict[Arch, List[str]] = {}
+
     def get_packages_for_arch(self, arch: Arch):
-        return [
-            package.name for package in self.packages
-            if not package.platforms or package.platforms.includes_platform(arch.rpm)
-        ]
+        packages = self._packages_by_arch.get(arch)
+        if packages is None:
+            packages = self._packages_by_arch[arch] = [
+                package.name for package in self.packages
+                if not package.platforms or package.platforms.includes_platform(arch.rpm)
+            ]
+
+        return list(packages)
 
     def get_component_label(self, fallback_name: str):
         # Return the com.redhat.component label - which is the "name" of the
@@ -212,13 +218,20 @@ class ComposeSpec(BaseSpec):
         self.modules = self._get_str_list('modules', [])
 
 
+# Use the libyaml-based loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 class ContainerSpec(BaseSpec):
-    def __init__(self, path):
-        with open(path) as f:
-            try:
-                container_yaml = yaml.safe_load(f)
-            except yaml.YAMLError as e:
-                raise ValidationError(str(e)) from e
+    def __init__(self, path, text: Optional[str] = None):
+        if text is None:
+            with open(path) as f:
+                text = f.read()
+
+        try:
+            container_yaml = yaml.load(text, Loader=_YAML_LOADER)
+        except yaml.YAMLError as e:
+            raise ValidationError(str(e)) from e
 
         super().__init__(path, container_yaml)
 
@@ -263,3 +276,8 @@ class ContainerSpec(BaseSpec):
                         f"    flatpak:{a.replace('_', '-')}" for a in unset_attrs
                     )
                 )
+
+    @classmethod
+    def from_text(cls, text: str, *, path=None) -> "ContainerSpec":
+        # path is only used for error messages
+        return cls(path if path is not None else "<string>", text=text)
@@ -0,0 +1,23 @@
+"""cache_paths: Where depchase keeps its local copies of repository metadata
+
+This is kept separate from fetchrepodata so that code which only needs to
+look at the cache doesn't pull in the downloading machinery.
+"""
+import os
+
+from ..utils import Arch
+
+
+def get_cache_dir():
+    # Read the environment each time, like koji_utils does for the koji cache
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "flatpak-module-tools")
+
+
+def get_local_cache_path(local_cache_name: str, arch: Arch):
+    return os.path.join(get_cache_dir(), "repos", local_cache_name, arch.rpm)
+
+
+def get_cached_repomd_path(tag: str, arch: Arch):
+    """Path to the cached repomd.xml for tag; it may not have been downloaded yet"""
+    return os.path.join(get_local_cache_path(tag, arch), "repodata", "repomd.xml")
@@ -211,39 +211,43 @@ def collate_packages(
     return packages
 
 
-def print_packages(packages, json_output, source):
+def _group_by_source(packages) -> Dict[str, List[PackageInfo]]:
+    source_packages: DefaultDict[str, List[PackageInfo]] = defaultdict(list)
+    for package in packages.values():
+        assert package.source
+        source_packages[package.source].append(package)
+
+    return source_packages
+
+
+def packages_to_json(packages, source):
     if source:
-        source_packages: DefaultDict[str, List[PackageInfo]] = defaultdict(list)
-        for package in packages.values():
-            assert package.source
-            source_packages[package.source].append(package)
-
-        if json_output:
-            json.dump(
-                {
-                    k: [p.to_json(include_source=False)
-                        for p in sorted(source_packages[k], key=lambda package: package.name)]
-                    for k in sorted(source_packages)
-                },
-                sys.stdout, indent=4
-            )
-        else:
-            for source_name in sorted(source_packages):
-                print(source_name)
-                packages_for_source = source_packages[source_name]
-                for package in sorted(packages_for_source, key=lambda package: package.name):
-                    print("    " + package.name)
-                    package.print_explanation("        ")
+        source_packages = _group_by_source(packages)
+        return {
+            k: [p.to_json(include_source=False)
+                for p in sorted(source_packages[k], key=lambda package: package.name)]
+            for k in sorted(source_packages)
+        }
     else:
-        if json_output:
-            json.dump(
-                [packages[p].to_json() for p in sorted(packages.keys())], sys.stdout, indent=4
-            )
-        else:
-            for package_name in sorted(packages):
-                package = packages[package_name]
-                print(package_name)
-                package.print_explanation("     ")
+        return [packages[p].to_json() for p in sorted(packages.keys())]
+
+
+def print_packages(packages, json_output, source):
+    if json_output:
+        json.dump(packages_to_json(packages, source), sys.stdout, indent=4)
+    elif source:
+        source_packages = _group_by_source(packages)
+        for source_name in sorted(source_packages):
+            print(source_name)
+            packages_for_source = source_packages[source_name]
+            for package in sorted(packages_for_source, key=lambda package: package.name):
+                print("    " + package.name)
+                package.print_explanation("        ")
+    else:
+        for package_name in sorted(packages):
+            package = packages[package_name]
+            print(package_name)
+            package.print_explanation("     ")
 
 
 @cli.command("resolve-packages")
@@ -328,6 +332,64 @@ def resolve_requires(ctx, requires, json_output, source, ignore_requires, preins
     print_packages(packages, json_output, source)
 
 
+@cli.command("resolve-requires-multi")
+@click.option(
+    "--ignore-requires", metavar="PKG:DEP", multiple=True,
+    help="Ignore the dependency of PKG on DEP."
+)
+@click.option(
+    "--preinstalled", metavar='PACKAGE_LIST', required=False,
+    help="List of packages to assume that are already installed"
+)
+@click.argument("requires_json", metavar='REQUIRES_JSON', type=click.File("r"))
+@click.pass_context
+def resolve_requires_multi(ctx, requires_json, ignore_requires, preinstalled):
+    """Resolve several independent lists of requirements at once
+
+    REQUIRES_JSON ('-' for standard input) is a JSON object mapping names to
+    lists of requirements. Each list is resolved separately, and the output is
+    a JSON object mapping the same names to the output of
+    'resolve-requires --json --source'. Repository metadata is only loaded once.
+    """
+    requires_map = json.load(requires_json)
+
+    pool = CliData.from_context(ctx).make_pool()
+    for x in ignore_requires:
+        pkg, dep = x.split(':', 1)
+        depchase.remove_requires(pool, pkg, dep)
+
+    if preinstalled:
+        preinstalled_packages = read_preinstalled_packages(preinstalled)
+    else:
+        preinstalled_packages = []
+
+    # Requirements can't be resolved one at a time and combined, since how a
+    # requirement is satisfied depends on the rest of the transaction, but
+    # duplicate requirements and identical requirement lists only need
+    # to be solved once.
+    resolved: Dict[Tuple[str, ...], Dict] = {}
+    result = {}
+    for name, requires in requires_map.items():
+        unique_requires = tuple(sorted(set(requires)))
+        if unique_requires not in resolved:
+            transaction = depchase.Transaction(pool)
+            transaction.add_provides(unique_requires)
+            if preinstalled:
+                transaction.set_hints(preinstalled_packages)
+
+            transaction.solve()
+
+            packages = collate_packages(
+                transaction, requested_requires=unique_requires,
+                preinstalled_packages=preinstalled_packages
+            )
+            resolved[unique_requires] = packages_to_json(packages, source=True)
+
+        result[name] = resolved[unique_requires]
+
+    json.dump(result, sys.stdout, indent=4)
+
+
 @cli.command
 @click.option("--runtime-profile", metavar='PROFILE_FILE', required=True)
 @click.argument("pkgs", metavar='PKGS', nargs=-1, required=True)
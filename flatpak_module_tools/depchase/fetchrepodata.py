@@ -17,12 +17,9 @@ from requests_toolbelt.downloadutils.tee import tee_to_file
 
 from ..config import get_profile
 from ..utils import Arch, info, verbose
+from .cache_paths import get_cache_dir, get_local_cache_path
 
 
-XDG_CACHE_HOME = (os.environ.get("XDG_CACHE_HOME")
-                  or os.path.expanduser("~/.cache"))
-CACHEDIR = os.path.join(XDG_CACHE_HOME, "flatpak-module-tools")
-
 log = logging.getLogger(__name__)
 
 
@@ -58,7 +55,7 @@ class RepoPaths:
 
 
 def _define_repo(remote_repo_url: str, local_cache_name: str, arch: Arch):
-    local_cache_path = os.path.join(CACHEDIR, "repos", local_cache_name, arch.rpm)
+    local_cache_path = get_local_cache_path(local_cache_name, arch)
 
     return RepoPaths(remote_repo_url, local_cache_path)
 
@@ -206,7 +203,7 @@ def load_cached_repodata(tag: str, arch: Arch):
 
     # Load the metadata
     return LocalMetadataCache(
-        cache_dir=CACHEDIR,
+        cache_dir=get_cache_dir(),
         repo_cache_paths={
             n: c.local_cache_path
             for n, c in paths.repo_paths_by_name.items()
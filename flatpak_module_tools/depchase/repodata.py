@@ -7,7 +7,8 @@ from typing import List
 
 import solv
 
-from .fetchrepodata import load_cached_repodata, CACHEDIR
+from .cache_paths import get_cache_dir
+from .fetchrepodata import load_cached_repodata
 from ..utils import die
 
 
@@ -282,6 +283,6 @@ def setup_repos(tag, arch, local_repos):
 
     for localrepo in local_repos:
         name, path = localrepo.split(":", 1)
-        repos.append(Repo(name, os.path.abspath(path), CACHEDIR))
+        repos.append(Repo(name, os.path.abspath(path), get_cache_dir()))
 
     return repos
@@ -80,7 +80,7 @@ def _download_koji_name_stream(profile, koji_name_stream, outdir):
         die(f"Cannot find any Flatpak builds for {koji_name_stream}")
 
     build = builds[0]
-    archives = session.listArchives(build['build_id'])
+    archives = session.listArchives(build['build_id'], type='image')
 
     pathinfo = koji.PathInfo(topdir=options['topurl'])
     url = '/'.join((pathinfo.imagebuild(build), archives[0]['filename']))
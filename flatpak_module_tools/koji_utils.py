@@ -1,7 +1,12 @@
 from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
 from textwrap import dedent
 import time
-from typing import List, Optional, TextIO
+from typing import Any, Dict, List, Optional, TextIO
 
 import click
 import koji
@@ -11,6 +16,98 @@ from .console_logging import LiveDisplay, RenderWhen
 from .utils import error
 
 
+# Default lifetime of cached koji results, in seconds
+KOJI_CACHE_TTL = 3600
+
+
+def _get_koji_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return Path(cache_home) / "flatpak-module-tools" / "koji"
+
+
+def _get_koji_cache_path(server: Optional[str], key: Any) -> Path:
+    key_json = json.dumps([server, key], sort_keys=True)
+    return _get_koji_cache_dir() / (hashlib.sha1(key_json.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_cached_koji_result(server: Optional[str], key: Any,
+                            ttl: Optional[float] = KOJI_CACHE_TTL) -> Any:
+    """Look up a result stored with store_cached_koji_result()
+
+    :param server: URL of the koji hub the result came from
+    :param key: JSON-serializable description of the query
+    :param ttl: seconds before a cached result expires; None means the
+       result never changes (e.g. the contents of a completed build).
+    :raises KeyError: if there is no cached result, or it has expired
+    """
+    cache_path = _get_koji_cache_path(server, key)
+    try:
+        if ttl is None or time.time() - cache_path.stat().st_mtime < ttl:
+            with open(cache_path, "r") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    raise KeyError(key)
+
+
+def store_cached_koji_result(server: Optional[str], key: Any, result: Any):
+    """Store a result from koji on disk, if it is JSON-serializable"""
+    try:
+        data = json.dumps(result)
+    except TypeError:
+        return
+
+    cache_path = _get_koji_cache_path(server, key)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def cached_koji_call(profile: ProfileConfig, method: str, *args,
+                     ttl: Optional[float] = KOJI_CACHE_TTL, **kwargs) -> Any:
+    """Call a koji method, caching the result on disk across invocations
+
+    :param ttl: seconds before a cached result is refetched; None means the
+       result never changes (e.g. the contents of a completed build) and
+       the cached value is always used.
+    """
+    server = profile.koji_options.get("server")
+    key = [method, args, kwargs]
+
+    try:
+        return load_cached_koji_result(server, key, ttl=ttl)
+    except KeyError:
+        pass
+
+    result = getattr(profile.koji_session, method)(*args, **kwargs)
+    # An empty result may just mean that koji doesn't have the data *yet*
+    if result:
+        store_cached_koji_result(server, key, result)
+
+    return result
+
+
+def list_image_archives(profile: ProfileConfig, build: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """List the image archives of a koji build
+
+    The archives of a completed build never change, so they are cached on disk
+    without expiry; for a build in any other state, koji is always asked.
+    """
+    if build["state"] == koji.BUILD_STATES["COMPLETE"]:
+        return cached_koji_call(
+            profile, "listArchives", buildID=build["build_id"], type="image", ttl=None
+        )
+    else:
+        return profile.koji_session.listArchives(buildID=build["build_id"], type="image")
+
+
 @dataclass
 class KojiRepo:
     profile: ProfileConfig
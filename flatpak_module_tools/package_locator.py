@@ -16,22 +16,56 @@
 # mirrorlist and metalink support wouldn't be that hard. $releasever would
 # require it being known and passed in.
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from configparser import RawConfigParser
-from functools import total_ordering
-import gzip
+from functools import cached_property, cmp_to_key, total_ordering
+import itertools
 import logging
 from pathlib import Path
-from typing import List, Optional, Union
-import xml.etree.ElementTree as ET
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import zlib
 
+from lxml import etree as ET
 import requests
+from requests.adapters import HTTPAdapter
+import rpm
 
 from .rpm_utils import VersionInfo
 from .utils import Arch
 
 logger = logging.getLogger(__name__)
 
+# (epoch, version, release) as found in repository metadata
+_EVR = Tuple[str, str, str]
+
+# Size of the reads used when downloading repomd.xml
+REPOMD_CHUNK_SIZE = 8192
+
+# Size of the reads used when downloading and decompressing primary.xml.gz
+PRIMARY_CHUNK_SIZE = 65536
+
+# (connect, read) timeout for HTTP requests, in seconds
+REQUEST_TIMEOUT = (30, 120)
+
+# Maximum number of repositories to fetch metadata for at once
+MAX_FETCH_WORKERS = 8
+
+# Maximum size of a .repo file we are willing to download and parse
+MAX_REPO_FILE_SIZE = 1_000_000
+
+_evr_key = cmp_to_key(rpm.labelCompare)  # type: ignore
+
+_REPO_NS = "{http://linux.duke.edu/metadata/repo}"
+_DATA_TAG = f"{_REPO_NS}data"
+_LOCATION_TAG = f"{_REPO_NS}location"
+
+_COMMON_NS = "{http://linux.duke.edu/metadata/common}"
+_PACKAGE_TAG = f"{_COMMON_NS}package"
+_NAME_TAG = f"{_COMMON_NS}name"
+_VERSION_TAG = f"{_COMMON_NS}version"
+
 
 @total_ordering
 class ExtendedVersionInfo(VersionInfo):
@@ -45,10 +79,7 @@ class ExtendedVersionInfo(VersionInfo):
         self.priority = priority
 
     def __lt__(self, other):
-        return (
-            self.priority > other.priority or
-            (self.priority == other.priority and super().__lt__(other))
-        )
+        return self.sort_key < other.sort_key
 
     def __eq__(self, other):
         return (
@@ -62,6 +93,15 @@ class ExtendedVersionInfo(VersionInfo):
             super().__ne__(other)
         )
 
+    @cached_property
+    def sort_key(self):
+        """Key for max()/sort(), also used by the ordering operators
+
+        Priorities are compared as plain integers; rpm.labelCompare() is only
+        called when the priorities are equal.
+        """
+        return (-self.priority, _evr_key(self._to_tuple()))
+
     def __repr__(self):
         return super().__repr__() + f", priority={self.priority}"
 
@@ -85,11 +125,21 @@ class RepoInfo:
 
 def _extract_repo_info(session: requests.Session, repourl: str):
     """Parses a repository file and extract any repositories found"""
-    response = session.get(repourl)
-    response.raise_for_status()
+    with session.get(repourl, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+
+        # A .repo file is a few kilobytes; anything much bigger is a misconfigured
+        # server handing back something else, so don't download and decode it.
+        content_length = int(response.headers.get("content-length", 0))
+        if content_length > MAX_REPO_FILE_SIZE:
+            raise RuntimeError(
+                f"{repourl}: repository file is too large ({content_length} bytes)"
+            )
+
+        repo_text = response.text
 
     cp = RawConfigParser()
-    cp.read_string(response.text)
+    cp.read_string(repo_text)
 
     for section in cp.sections():
         baseurl = cp.get(section, "baseurl", fallback=None)
@@ -111,17 +161,26 @@ def _extract_repo_info(session: requests.Session, repourl: str):
         )
 
 
-def _extract_primary_location(repomd_xml: str):
-    root = ET.fromstring(repomd_xml)
+def _extract_primary_location(repomd_chunks: Iterable[bytes]):
+    """Finds the location of the primary metadata in the contents of repomd.xml
+
+    Parsing stops as soon as the location is found; chunks after that are
+    left unconsumed in repomd_chunks.
+    """
+    # Only the elements we look at are reported, everything else is skipped in libxml2
+    parser = ET.XMLPullParser(events=("start",), tag=(_DATA_TAG, _LOCATION_TAG))
+    data_type = None
 
-    ns = {
-        'repo': 'http://linux.duke.edu/metadata/repo',
-    }
-    primary_location = root.find("./repo:data[@type='primary']/repo:location", ns)
-    if primary_location is None:
-        raise RuntimeError("Cannot find <data type='primary'/> in repomd.xml")
+    for chunk in repomd_chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            # Attributes are already available at the "start" event
+            if element.tag == _DATA_TAG:
+                data_type = element.get("type")
+            elif element.tag == _LOCATION_TAG and data_type == "primary":
+                return element.attrib['href']
 
-    return primary_location.attrib['href']
+    raise RuntimeError("Cannot find <data type='primary'/> in repomd.xml")
 
 
 def _get_primary_metadata_url(session: requests.Session,
@@ -129,28 +188,43 @@ def _get_primary_metadata_url(session: requests.Session,
                               baseurl: str):
     """Finds location of primary metadata xml.gz from repodata.xml"""
     repomd_url = baseurl + "repodata/repomd.xml"
-    response = session.get(repomd_url, proxies=repo_info.get_proxies())
-    response.raise_for_status()
+    with session.get(
+        repomd_url, stream=True, proxies=repo_info.get_proxies(), timeout=REQUEST_TIMEOUT
+    ) as response:
+        response.raise_for_status()
 
-    return baseurl + _extract_primary_location(response.text)
+        chunks = response.iter_content(chunk_size=REPOMD_CHUNK_SIZE)
+        location = _extract_primary_location(chunks)
+
+        # Closing a partially read response discards the connection; repomd.xml
+        # is small, so read the rest of it to let the connection be reused.
+        for _ in chunks:
+            pass
+
+        return baseurl + location
 
 
 def _get_primary_metadata_path(session: requests.Session,
                                baseurl: Path):
     """Finds location of primary metadata xml.gz from repodata.xml"""
-    with open(baseurl / "repodata/repomd.xml", "r") as f:
-        repomd_xml = f.read()
-
-    return baseurl / _extract_primary_location(repomd_xml)
+    with open(baseurl / "repodata/repomd.xml", "rb") as f:
+        return baseurl / _extract_primary_location(
+            iter(lambda: f.read(REPOMD_CHUNK_SIZE), b"")
+        )
 
 
 class PackageLocator:
     def __init__(self, session: Optional[requests.Session] = None):
         if session is None:
             session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
 
         self.session = session
         self.repos: List[RepoInfo] = []
+        self._package_indexes: Dict[Tuple[RepoInfo, Arch], Dict[str, List[_EVR]]] = {}
+        self._latest_versions: Dict[Tuple[str, Arch], Optional[VersionInfo]] = {}
 
     def add_repo(self, baseurl: Union[str, Path], *,
                  proxy: Optional[str] = None,
@@ -158,15 +232,14 @@ class PackageLocator:
                  includepkgs: Optional[str] = None,
                  excludepkgs: Optional[str] = None):
         self.repos.append(RepoInfo(baseurl=baseurl, proxy=proxy, priority=priority))
+        self._latest_versions.clear()
 
     def add_remote_repofile(self, url):
         self.repos.extend(_extract_repo_info(self.session, url))
+        self._latest_versions.clear()
 
-    def _find_package_from_repo_info(self,
-                                     repo_info: RepoInfo,
-                                     package: str,
-                                     arch: Arch):
-        """Parses the primary metadata .xml.gz for the repository to look for a package"""
+    def _iter_primary_chunks(self, repo_info: RepoInfo, arch: Arch):
+        """Yields the compressed contents of the primary metadata .xml.gz in chunks"""
 
         baseurl = repo_info.baseurl
         if isinstance(baseurl, str) and (baseurl.startswith("http:") or
@@ -175,52 +248,157 @@ class PackageLocator:
             if not baseurl.endswith("/"):
                 baseurl += "/"
 
-            logger.info("Looking for %s in %s", package, baseurl)
+            logger.info("Reading package list from %s", baseurl)
             primary_url = _get_primary_metadata_url(self.session, repo_info, baseurl)
-            primary_response = requests.get(
-                primary_url, stream=True, proxies=repo_info.get_proxies())
-            primary_response.raise_for_status()
-
-            decompressed = gzip.GzipFile(fileobj=primary_response.raw, mode="r")
+            # The whole file is normally read, which lets the connection go back to
+            # the pool; the context manager makes sure it is closed if parsing fails
+            with self.session.get(
+                primary_url, stream=True, proxies=repo_info.get_proxies(), timeout=REQUEST_TIMEOUT
+            ) as primary_response:
+                primary_response.raise_for_status()
+                # We decompress the .xml.gz ourselves; if the server also labels it
+                # with Content-Encoding: gzip, don't let urllib3 decompress it first.
+                yield from primary_response.raw.stream(PRIMARY_CHUNK_SIZE,
+                                                       decode_content=False)
         else:
-            logger.info("Looking for %s in %s", package, baseurl)
+            logger.info("Reading package list from %s", baseurl)
             primary_path = _get_primary_metadata_path(self.session, Path(baseurl))
-            decompressed = gzip.GzipFile(filename=primary_path, mode="r")
+            with open(primary_path, "rb") as f:
+                yield from iter(lambda: f.read(PRIMARY_CHUNK_SIZE), b"")
+
+    def _build_package_index(self, repo_info: RepoInfo, arch: Arch):
+        """Parses the primary metadata .xml.gz for the repository
+
+        Returns a mapping from package name to a list of (epoch, version, release) tuples.
+        """
+
+        index: Dict[str, List[_EVR]] = {}
+
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS + 16)
+        # Only <package> elements are reported, so the rest of the document
+        # never reaches Python code
+        parser = ET.XMLPullParser(events=("end",), tag=_PACKAGE_TAG)
+
+        def read_packages():
+            for _, element in parser.read_events():
+                name = element.findtext(_NAME_TAG)
+                version = element.find(_VERSION_TAG)
+                assert name is not None and version is not None
+                version_attrib = version.attrib
+
+                # Names repeat across repositories and nearly every epoch is "0",
+                # so share the string objects rather than keeping a copy per package
+                name = sys.intern(name)
+                index.setdefault(name, []).append(
+                    (sys.intern(version_attrib["epoch"]),
+                     version_attrib["ver"], version_attrib["rel"])
+                )
+
+                # Drop the contents of the element and the already processed
+                # (empty) elements before it, so memory use doesn't grow with
+                # the number of packages in the repository
+                element.clear()
+                parent = element.getparent()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+        for chunk in self._iter_primary_chunks(repo_info, arch):
+            parser.feed(decompressor.decompress(chunk))
+            read_packages()
+
+        parser.feed(decompressor.flush())
+        parser.close()
+        read_packages()
+
+        return index
+
+    def _index_repos(self, repos: List[RepoInfo], arch: Arch):
+        """Makes sure that the package indexes for repos have been built
+
+        Fetching and parsing metadata is mostly waiting on the network, so
+        the repositories that haven't been indexed yet are done in parallel.
+        """
+        missing = [
+            repo for repo in dict.fromkeys(repos) if (repo, arch) not in self._package_indexes
+        ]
+        if not missing:
+            return
+
+        max_workers = min(MAX_FETCH_WORKERS, len(missing))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            indexes = executor.map(lambda repo: self._build_package_index(repo, arch), missing)
+            for repo, index in zip(missing, indexes):
+                self._package_indexes[(repo, arch)] = index
 
-        ns = {
-            'common': 'http://linux.duke.edu/metadata/common',
-        }
+    def _find_package_from_repo_info(self,
+                                     repo_info: RepoInfo,
+                                     package: str,
+                                     arch: Arch) -> Optional[_EVR]:
+        """Returns the latest (epoch, version, release) of package in the repository
 
-        for event, element in ET.iterparse(decompressed):
-            if event == "end" and element.tag == "{http://linux.duke.edu/metadata/common}package":
-                name = element.find("common:name", ns).text
-                if name == package:
-                    version_element = element.find("common:version", ns)
-                    extended_version = ExtendedVersionInfo(
-                        epoch=version_element.attrib["epoch"],
-                        version=version_element.attrib["ver"],
-                        release=version_element.attrib["rel"],
-                        priority=repo_info.priority,
-                    )
+        The repository metadata is downloaded and parsed only the first time a
+        repository is searched for a given architecture.
+        """
 
-                    logger.info("Found %s", extended_version)
-                    yield extended_version
+        key = (repo_info, arch)
+        index = self._package_indexes.get(key)
+        if index is None:
+            index = self._package_indexes[key] = self._build_package_index(repo_info, arch)
 
-                # Save most of the memory by clearing the contents
-                element.clear()
+        evrs = index.get(package)
+        if not evrs:
+            return None
+
+        # Only the latest version is ever needed, so once it has been found,
+        # keep just that for any later lookups
+        if len(evrs) > 1:
+            evrs[:] = [max(evrs, key=_evr_key)]
+
+        return evrs[0]
 
     def find_latest_version(self, package: str, *,
                             session: Optional[requests.Session] = None,
                             arch: Arch) -> Optional[VersionInfo]:
-        if session is None:
-            session = requests.Session()
+        """Finds the latest version of package in the configured repositories
+
+        :param session: deprecated and ignored; the session passed to
+           the PackageLocator constructor is used for all requests
+        """
+        # Results are remembered until the set of repositories changes
+        key = (package, arch)
+        try:
+            return self._latest_versions[key]
+        except KeyError:
+            pass
+
+        result = self._latest_versions[key] = self._search_latest_version(package, arch)
+        return result
+
+    def _search_latest_version(self, package: str, arch: Arch) -> Optional[VersionInfo]:
+        # A match in a higher priority (lower number) repository always wins over
+        # lower priority repositories, so search one priority tier at a time and
+        # stop at the first tier with any match.
+        tiers = itertools.groupby(sorted(self.repos, key=lambda repo: repo.priority),
+                                  key=lambda repo: repo.priority)
+
+        for priority, tier in tiers:
+            tier_repos = list(tier)
+            self._index_repos(tier_repos, arch)
+
+            candidates = []
+            for repo in tier_repos:
+                # Only the best version in each repository needs to be compared further
+                evr = self._find_package_from_repo_info(repo, package, arch)
+                if evr:
+                    epoch, version, release = evr
+                    extended_version = ExtendedVersionInfo(
+                        epoch=epoch, version=version, release=release, priority=priority
+                    )
+                    logger.info("Found %s", extended_version)
+                    candidates.append(extended_version)
 
-        candidates = [version
-                      for repo in self.repos
-                      for version in self._find_package_from_repo_info(repo, package, arch)]
+            if candidates:
+                best = max(candidates, key=lambda candidate: candidate.sort_key)
+                return VersionInfo(best.epoch, best.version, best.release)
 
-        if candidates:
-            best = max(candidates)
-            return VersionInfo(best.epoch, best.version, best.release)
-        else:
-            return None
+        return None
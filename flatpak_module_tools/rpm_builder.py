@@ -1,18 +1,24 @@
+from functools import cached_property, lru_cache
+import hashlib
+import importlib.metadata
+import itertools
 import json
 import os
 from pathlib import Path
 import subprocess
+import sys
 from tempfile import NamedTemporaryFile
 import time
-from typing import Any, Collection, Dict, List, Tuple
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
 import click
 import koji
-import networkx
 
 from .build_scheduler import KojiBuildScheduler, MockBuildScheduler
 from .build_context import BuildContext
 from .console_logging import Status
+from .koji_utils import load_cached_koji_result, store_cached_koji_result
+from .depchase.cache_paths import get_cached_repomd_path
 from .mock import make_mock_cfg
 from .rpm_utils import StrippedVersionInfo
 from .utils import Arch, error
@@ -27,30 +33,182 @@ _FLAGS_TO_REL = {
 }
 
 
+_RELATION_MASK = koji.RPMSENSE_LESS | koji.RPMSENSE_EQUAL | koji.RPMSENSE_GREATER
+
+
 def flags_to_rel(flags):
-    return _FLAGS_TO_REL[flags & (koji.RPMSENSE_LESS | koji.RPMSENSE_EQUAL | koji.RPMSENSE_GREATER)]
+    return _FLAGS_TO_REL[flags & _RELATION_MASK]
 
 
 RPMSENSE_RPMLIB = (1 << 24)  # rpmlib(feature) dependency.
 
 
-def print_explanation(explanation, prefix, buildrequiring=None):
+def _deps_to_requires(deps) -> List[str]:
+    """Converts the result of koji getRPMDeps() into a list of requirement strings"""
+    # Local names for the constants used for every dependency
+    rpmlib = RPMSENSE_RPMLIB
+    relation_mask = _RELATION_MASK
+    flags_to_rel_map = _FLAGS_TO_REL
+
+    # The relation lookup is the same as flags_to_rel(), inlined since this
+    # runs for every dependency
+    return [
+        f"{dep['name']} {flags_to_rel_map[dep['flags'] & relation_mask]} {dep['version']}"
+        if dep["version"] != "" else dep["name"]
+        for dep in deps
+        if dep["flags"] & rpmlib == 0
+    ]
+
+
+def format_explanation(explanation, prefix, buildrequiring=None) -> List[str]:
     if explanation is None:
-        print(f"{prefix}<in input>")
+        return [f"{prefix}<in input>"]
+
+    lines = []
+    if len(explanation) % 2 == 0:
+        provide = explanation[0]
+        provided_by = explanation[1]
+        lines.append(f"{prefix}{buildrequiring} buildrequires {provide}, provided by {provided_by}")
+        start = 1
     else:
-        if len(explanation) % 2 == 0:
-            provide = explanation[0]
-            provided_by = explanation[1]
-            print(f"{prefix}{buildrequiring} buildrequires {provide}, provided by {provided_by}")
-            start = 1
-        else:
-            start = 0
+        start = 0
+
+    for i in range(start, len(explanation) - 2, 2):
+        required_by = explanation[i]
+        provide = explanation[i + 1]
+        provided_by = explanation[i + 2]
+        lines.append(f"{prefix}{required_by} requires {provide}, provided by {provided_by}")
+
+    return lines
+
+
+def print_explanation(explanation, prefix, buildrequiring=None):
+    print("\n".join(format_explanation(explanation, prefix, buildrequiring)))
+
+
+# depchase commands whose output only depends on their arguments and the
+# repository metadata, so can be cached until the metadata changes
+CACHEABLE_DEPCHASE_COMMANDS = {
+    "list-rpms", "resolve-packages", "resolve-requires", "resolve-requires-multi"
+}
+
+
+# Bump when the format of cached depchase output changes
+DEPCHASE_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _get_tools_version() -> Optional[str]:
+    try:
+        return importlib.metadata.version("flatpak-module-tools")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _store_depchase_cache(cache_path: Path, output: str):
+    """Writes a cached depchase result, replacing results for older metadata"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    query_prefix = cache_path.name.rsplit("-", 1)[0]
+    for old_path in cache_path.parent.glob(f"{query_prefix}-*.json"):
+        if old_path != cache_path:
+            old_path.unlink(missing_ok=True)
+
+    with NamedTemporaryFile("w", encoding="utf-8", dir=cache_path.parent,
+                            prefix=cache_path.name, suffix=".tmp", delete=False) as f:
+        f.write(output)
+    os.replace(f.name, cache_path)
+
 
-        for i in range(start, len(explanation) - 2, 2):
-            required_by = explanation[i]
-            provide = explanation[i + 1]
-            provided_by = explanation[i + 2]
-            print(f"{prefix}{required_by} requires {provide}, provided by {provided_by}")
+def _file_digest(path: Path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+# Bounds, in seconds, on the interval between checks when waiting for a koji repository
+REPO_POLL_MIN_INTERVAL = 1.0
+REPO_POLL_MAX_INTERVAL = 20.0
+
+
+# Maximum number of cycles to find before giving up and reporting
+MAX_CYCLES = 25
+
+# Number of cycles shown to the user
+MAX_REPORTED_CYCLES = 5
+
+# Cycles are looked for with increasing length bounds - short cycles are the
+# most useful to report and much cheaper to enumerate than all cycles
+CYCLE_LENGTH_BOUNDS = (4, 8, 16)
+
+
+def _find_cycles(G, limit):
+    import networkx
+
+    cycles = []
+
+    # Every cycle lies within a single strongly connected component, so
+    # components with one node and no self-loop can be skipped entirely
+    for component in networkx.strongly_connected_components(G):
+        if len(component) == 1:
+            node = next(iter(component))
+            if not G.has_edge(node, node):
+                continue
+
+        subgraph = G.subgraph(component)
+        wanted = min(MAX_REPORTED_CYCLES, limit - len(cycles))
+        for length_bound in CYCLE_LENGTH_BOUNDS:
+            # Each search also finds all the cycles of the previous one; the
+            # last, widest, search only needs to find as many as we show
+            if length_bound == CYCLE_LENGTH_BOUNDS[-1]:
+                max_found = wanted
+            else:
+                max_found = limit - len(cycles)
+            found = list(itertools.islice(
+                networkx.simple_cycles(subgraph, length_bound=length_bound), max_found
+            ))
+            if len(found) >= wanted:
+                break
+
+        if not found:
+            # A non-trivial component always has a cycle, it's just a long one
+            found = list(itertools.islice(networkx.simple_cycles(subgraph), 1))
+
+        cycles.extend(found)
+        if len(cycles) >= limit:
+            break
+
+    return cycles
+
+
+def _has_cycle(adjacency: Dict[str, Collection[str]]):
+    """Iterative depth-first search for a cycle in a graph given as adjacency lists"""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = dict.fromkeys(adjacency, WHITE)
+
+    for root in adjacency:
+        if color[root] != WHITE:
+            continue
+
+        color[root] = GREY
+        stack = [(root, iter(adjacency[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                child_color = color.get(child, BLACK)
+                if child_color == GREY:
+                    return True
+                elif child_color == WHITE:
+                    color[child] = GREY
+                    stack.append((child, iter(adjacency[child])))
+                    break
+            else:
+                color[node] = BLACK
+                stack.pop()
+
+    return False
 
 
 def check_for_cycles(build_after, build_after_details):
@@ -60,34 +218,41 @@ def check_for_cycles(build_after, build_after_details):
         # try to ignore such cycles more generally - might get tricky.)
         return False
 
+    # A single depth-first search is enough to show that there are no cycles,
+    # which is the common case; only build a graph to enumerate cycles when
+    # reporting them.
+    if not _has_cycle(build_after):
+        return False
+
+    # networkx is slow to import, and is only needed when there are cycles
+    # to report, so don't import it up front for every command
+    import networkx
+
     G = networkx.DiGraph()
     G.add_nodes_from(build_after)
     for package, after in build_after.items():
         for name in after:
             G.add_edge(package, name)
 
-    cycles = list()
-    cycles_iter = networkx.simple_cycles(G)  # type: ignore
-    for cycle in cycles_iter:
-        cycles.append(cycle)
-        if len(cycles) == 25:
-            break
+    cycles = _find_cycles(G, MAX_CYCLES)
 
     cycles.sort(key=lambda x: len(x))
-    for c in cycles[0:5]:
+    for c in cycles[0:MAX_REPORTED_CYCLES]:
         error("Found cycle")
+        lines = []
         for i, x in enumerate(c):
             y = c[(i + 1) % len(c)]
-            print(f"    {x} ⇒ {y}")
-            print_explanation(
+            lines.append(f"    {x} ⇒ {y}")
+            lines.extend(format_explanation(
                 build_after_details[x][y][0]["explanation"],
                 prefix="        ",
                 buildrequiring=x
-            )
-        print()
+            ))
+        # Write each cycle out in one go, rather than line by line
+        print("\n".join(lines) + "\n")
 
-    if len(cycles) > 5:
-        print("More than 5 cycles found, ignoring additional cycles")
+    if len(cycles) > MAX_REPORTED_CYCLES:
+        print(f"More than {MAX_REPORTED_CYCLES} cycles found, ignoring additional cycles")
 
     if len(cycles) > 0:
         raise click.ClickException("Cannot determine build order because of cycles")
@@ -101,22 +266,56 @@ class RpmBuilder:
         self.flatpak_spec = context.flatpak_spec
         self.workdir = workdir
 
+    @cached_property
+    def _source_tag(self) -> str:
+        """Koji tag with the source package builds"""
+        return self.profile.get_source_koji_tag(self.context.release)
+
+    @cached_property
+    def _rpm_target(self) -> str:
+        """Koji target that RPMs for the Flatpak are built with"""
+        return self.profile.get_rpm_koji_target(self.context.release)
+
+    @cached_property
+    def _rpm_dest_tag(self) -> str:
+        """Koji tag that RPM builds for the Flatpak are tagged into"""
+        return self.profile.koji_session.getBuildTarget(self._rpm_target)["dest_tag_name"]
+
+    @cached_property
+    def _preinstalled_packages_file(self) -> str:
+        """Path to a file listing the runtime packages, for depchase --preinstalled
+
+        The file is kept in the work directory and only rewritten when the list
+        of packages changes.
+        """
+        spec = self.flatpak_spec
+        packages_path = self.workdir / f"{spec.runtime_name}-{spec.runtime_version}.packages"
+        contents = "".join(f"{pkg}\n" for pkg in self.context.runtime_packages)
+
+        try:
+            unchanged = packages_path.read_text(encoding="utf-8") == contents
+        except FileNotFoundError:
+            unchanged = False
+
+        if not unchanged:
+            self.workdir.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(dir=self.workdir, prefix=packages_path.name,
+                                    mode="w", delete=False, encoding="utf-8") as tmp_file:
+                tmp_file.write(contents)
+            os.replace(tmp_file.name, packages_path)
+
+        return str(packages_path)
+
     def _run_depchase(self, cmd: str, args: List[str], *,
                       include_localrepo: bool,
                       include_tag: bool,
                       include_packages: bool,
-                      refresh: str = "missing"):
-        spec = self.flatpak_spec
+                      refresh: str = "missing",
+                      input: Optional[str] = None):
         if include_packages:
-            with NamedTemporaryFile(prefix=f"{spec.runtime_name}-{spec.runtime_version}",
-                                    suffix=".packages", mode="w",
-                                    delete=False, encoding="utf-8") as packages_file:
-                for pkg in self.context.runtime_packages:
-                    print(pkg, file=packages_file)
-                packages = ["--preinstalled", packages_file.name]
+            packages = ["--preinstalled", self._preinstalled_packages_file]
         else:
             packages = []
-            packages_file = None
 
         local_repo = []
         if include_localrepo and self.context.local_repo:
@@ -124,18 +323,76 @@ class RpmBuilder:
                 local_repo = [f"--local-repo=local:{self.context.local_repo}"]
 
         rpm_build_tag = self.context.app_build_repo.tag_name if include_tag else "NONE"
-        try:
-            return subprocess.check_output(
-                ["flatpak-module-depchase",
-                    f"--profile={self.profile.name}",
-                    f"--arch={self.arch.oci}",
-                    f"--tag={rpm_build_tag}",
-                    f"--refresh={refresh}"] + local_repo + [cmd] + packages + args,
-                encoding="utf-8"
+
+        cache_path = None
+        if refresh == "missing" and cmd in CACHEABLE_DEPCHASE_COMMANDS:
+            cache_path = self._get_depchase_cache_path(
+                cmd, args, input=input, rpm_build_tag=rpm_build_tag,
+                include_localrepo=bool(local_repo), include_packages=include_packages
             )
-        finally:
-            if packages_file:
-                os.remove(packages_file.name)
+            if cache_path and cache_path.exists():
+                return cache_path.read_text(encoding="utf-8")
+
+        output = subprocess.check_output(
+            ["flatpak-module-depchase",
+                f"--profile={self.profile.name}",
+                f"--arch={self.arch.oci}",
+                f"--tag={rpm_build_tag}",
+                f"--refresh={refresh}"] + local_repo + [cmd] + packages + args,
+            input=input,
+            encoding="utf-8"
+        )
+
+        if cache_path:
+            _store_depchase_cache(cache_path, output)
+
+        return output
+
+    def _get_depchase_cache_path(self, cmd: str, args: List[str], *,
+                                 input: Optional[str],
+                                 rpm_build_tag: str,
+                                 include_localrepo: bool,
+                                 include_packages: bool) -> Optional[Path]:
+        """Where to cache the output of a depchase command, or None if it can't be cached
+
+        The key includes the contents of the repomd.xml files for the repositories,
+        so a cached result is never used after the metadata changes.
+        """
+        tag_repomd_digest = None
+        if rpm_build_tag != "NONE":
+            tag_repomd_digest = _file_digest(
+                Path(get_cached_repomd_path(rpm_build_tag, self.arch))
+            )
+            if tag_repomd_digest is None:
+                # depchase will download the metadata first
+                return None
+
+        local_repomd_digest = None
+        if include_localrepo:
+            assert self.context.local_repo
+            local_repomd_digest = _file_digest(self.context.local_repo / "repodata/repomd.xml")
+
+        # The version is included since a new depchase may resolve differently
+        key = json.dumps({
+            "cache_version": DEPCHASE_CACHE_VERSION,
+            "tools_version": _get_tools_version(),
+            "profile": self.profile.name,
+            "tag": rpm_build_tag,
+            "arch": self.arch.oci,
+            "cmd": cmd,
+            "args": args,
+            "input": input,
+            "preinstalled": self.context.runtime_packages if include_packages else None,
+        }, sort_keys=True)
+
+        # The file name is {cmd}-{query digest}-{metadata digest}.json, so the
+        # entries for a query made against older metadata can be found and removed
+        query_digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        metadata_digest = hashlib.blake2b(json.dumps([
+            tag_repomd_digest, local_repomd_digest
+        ]).encode("utf-8"), digest_size=16).hexdigest()
+
+        return self.workdir / "depchase-cache" / f"{cmd}-{query_digest}-{metadata_digest}.json"
 
     def _refresh_metadata(self, include_localrepo: bool = True):
         self._run_depchase(
@@ -170,10 +427,8 @@ class RpmBuilder:
         source_session = self.profile.source_koji_session
         session = self.profile.koji_session
 
-        source_tag = self.context.profile.get_source_koji_tag(release=self.context.release)
-
-        rpm_target = self.profile.get_rpm_koji_target(self.context.release)
-        rpm_dest_tag = session.getBuildTarget(rpm_target)["dest_tag_name"]
+        source_tag = self._source_tag
+        rpm_dest_tag = self._rpm_dest_tag
 
         if include_localrepo:
             all_localrepo_package_versions = self.get_localrepo_package_versions()
@@ -192,17 +447,27 @@ class RpmBuilder:
             else:
                 display_table = [(True, "", source_tag, rpm_dest_tag, "", "")]
             wait_for_event = -1
-            for package in details.keys():
-                source_tag_infos = source_session.listTagged(
-                    source_tag, latest=True, inherit=True, package=package
-                )
+
+            # Batch the queries for all packages into one round-trip per koji hub
+            packages = list(details.keys())
+            with source_session.multicall(strict=True) as m:
+                source_calls = [
+                    m.listTagged(source_tag, latest=True, inherit=True, package=package)
+                    for package in packages
+                ]
+            with session.multicall(strict=True) as m:
+                package_calls = [
+                    m.listTagged(rpm_dest_tag, latest=True, inherit=False, package=package)
+                    for package in packages
+                ]
+
+            for package, source_call, package_call in zip(packages, source_calls, package_calls):
+                source_tag_infos = source_call.result
                 source_version_info = StrippedVersionInfo.from_dict(source_tag_infos[0])
 
                 ok = False
 
-                package_tag_infos = session.listTagged(
-                    rpm_dest_tag, latest=True, inherit=False, package=package
-                )
+                package_tag_infos = package_call.result
                 if package_tag_infos:
                     package_version_info = StrippedVersionInfo.from_dict(package_tag_infos[0])
                     if allow_outdated or package_version_info >= source_version_info:
@@ -232,27 +497,18 @@ class RpmBuilder:
                 if not ok:
                     need_rebuild.add(package)
 
-        widths = (
-            0,
-            max(len(row[1]) for row in display_table),
-            max(len(row[2]) for row in display_table),
-            max(len(row[3]) for row in display_table),
-            max(len(row[4]) for row in display_table),
-            max(len(row[5]) for row in display_table),
-        )
-
-        def pad(str, width):
-            return str + " " * (width - len(str))
+        # Transpose the table to get the width of each text column in one pass
+        _, *text_columns = zip(*display_table)
+        widths = [0] + [max(map(len, column)) for column in text_columns]
 
         click.echo()
         for i, row in enumerate(display_table):
             fg = "red" if not row[0] else None
+            # The version columns share a style, so style them as one string
+            versions = " ".join(cell.ljust(width) for cell, width in zip(row[2:], widths[2:]))
             click.echo(
-                click.style(pad(row[1], widths[1]), bold=True) +
-                " " + click.style(pad(row[2], widths[2]), fg=fg, bold=i == 0) +
-                " " + click.style(pad(row[3], widths[3]), fg=fg, bold=i == 0) +
-                " " + click.style(pad(row[4], widths[4]), fg=fg, bold=i == 0) +
-                " " + click.style(pad(row[5], widths[5]), fg=fg, bold=i == 0)
+                click.style(row[1].ljust(widths[1]), bold=True) +
+                " " + click.style(versions, fg=fg, bold=i == 0)
             )
         click.echo()
 
@@ -260,83 +516,107 @@ class RpmBuilder:
 
     def _get_latest_builds(self, to_build: Collection[str]):
         session = self.profile.source_koji_session
-        source_tag = self.profile.get_source_koji_tag(self.context.release)
-
-        def _get_latest_build(package):
-            tagged_builds = session.listTagged(
-                source_tag, package=package, inherit=True, latest=True
-            )
-            if len(tagged_builds) == 0:
-                raise click.ClickException(f"Can't find package '{package}' in {source_tag}")
-            return tagged_builds[0]
+        source_tag = self._source_tag
 
         with Status("Getting latest builds from koji"):
-            return {
-                package: _get_latest_build(package)
-                for package in sorted(to_build)
-            }
+            # Batch the queries into a single round-trip to koji
+            with session.multicall(strict=True) as m:
+                calls = {
+                    package: m.listTagged(source_tag, package=package, inherit=True, latest=True)
+                    for package in sorted(to_build)
+                }
+
+            latest_builds = {}
+            for package, call in calls.items():
+                tagged_builds = call.result
+                if len(tagged_builds) == 0:
+                    raise click.ClickException(f"Can't find package '{package}' in {source_tag}")
+                latest_builds[package] = tagged_builds[0]
+
+            return latest_builds
 
     def get_build_requires(self, build_id):
+        return self._get_build_requires_by_id([build_id])[build_id]
+
+    def _get_build_requires_by_id(self, build_ids: Collection[int]) -> Dict[int, List[str]]:
+        """Finds the build requirements of multiple builds, batching the koji calls
+
+        The build requirements of a build never change, so they are cached
+        on disk by build ID and only looked up in koji once.
+        """
         session = self.profile.source_koji_session
-        latest_src_rpm = session.listRPMs(build_id, arches=["src"])[0]
-        result: List[str] = []
+        server = self.profile.source_koji_options.get("server")
+
+        result = {}
+        missing = []
+        for build_id in build_ids:
+            try:
+                result[build_id] = load_cached_koji_result(
+                    server, ["build_requires", build_id], ttl=None
+                )
+            except KeyError:
+                missing.append(build_id)
 
-        deps = session.getRPMDeps(latest_src_rpm["id"], depType=koji.DEP_REQUIRE)
-        for dep in deps:
-            if dep["flags"] & RPMSENSE_RPMLIB != 0:
-                continue
-            if dep["version"] != "":
-                result.append(f"{dep['name']} {flags_to_rel(dep['flags'])} {dep['version']}")
-            else:
-                result.append(dep["name"])
+        if not missing:
+            return result
+
+        with session.multicall(strict=True) as m:
+            rpms_calls = [m.listRPMs(build_id, arches=["src"]) for build_id in missing]
+
+        with session.multicall(strict=True) as m:
+            deps_calls = [
+                m.getRPMDeps(call.result[0]["id"], depType=koji.DEP_REQUIRE)
+                for call in rpms_calls
+            ]
+
+        for build_id, call in zip(missing, deps_calls):
+            build_requires = _deps_to_requires(call.result)
+            store_cached_koji_result(server, ["build_requires", build_id], build_requires)
+            result[build_id] = build_requires
 
         return result
 
+    def _get_build_requires_map(self, latest_builds):
+        """Like get_build_requires() for multiple builds, keyed by package name"""
+        by_id = self._get_build_requires_by_id([build["id"] for build in latest_builds.values()])
+        return {package: by_id[build["id"]] for package, build in latest_builds.items()}
+
     def _compute_build_order(self, latest_builds, *, include_localrepo: bool):
+        if len(latest_builds) <= 1:
+            # Nothing to order; check_for_cycles() ignores a single SRPM anyway
+            return {package: frozenset() for package in latest_builds}
+
         with Status("Getting build requirements from koji"):
-            build_requires_map = {}
-            for package in latest_builds:
-                build_requires_map[package] = \
-                    self.get_build_requires(latest_builds[package]["id"])
+            build_requires_map = self._get_build_requires_map(latest_builds)
 
             build_after = {}
             build_after_details = {}
 
-        with Status("") as status:
-            EXPANDING_MESSAGE = "Expanding build requirements to determine build order"
-
-            for package in latest_builds:
-                status.message = f"{EXPANDING_MESSAGE}: {package}"
-                build_requires = build_requires_map[package]
-                if not build_requires:
-                    build_after[package] = set()
-                    build_after_details[package] = {}
-                    continue
-
-                output = self._run_depchase(
-                    "resolve-requires",
-                    [
-                        "--source",
-                        "--json",
-                    ] + build_requires,
-                    include_localrepo=include_localrepo,
-                    include_tag=True,
-                    include_packages=True)
-
-                resolved_build_requires = json.loads(output)
-                after = {
-                    required_name for required_name in resolved_build_requires
-                    if required_name != package and required_name in latest_builds
-                }
-                build_after[package] = after
-
+        with Status("Expanding build requirements to determine build order"):
+            # Resolve all the packages in a single depchase process, so the
+            # repository metadata is only loaded once
+            resolved_map = json.loads(self._run_depchase(
+                "resolve-requires-multi", ["-"],
+                include_localrepo=include_localrepo,
+                include_tag=True,
+                include_packages=True,
+                input=json.dumps({
+                    package: build_requires
+                    for package, build_requires in build_requires_map.items()
+                    if build_requires
+                })
+            ))
+
+            # Package names are interned so that each name appearing throughout
+            # the graph is a single string object
+            for package in map(sys.intern, latest_builds):
+                resolved_build_requires = resolved_map.get(package, {})
                 build_after_details[package] = {
-                    required_name:
+                    sys.intern(required_name):
                         details for required_name, details in resolved_build_requires.items()
                     if required_name != package and required_name in latest_builds
                 }
-
-            status.message = EXPANDING_MESSAGE
+                build_after[package] = frozenset(build_after_details[package])
 
         check_for_cycles(build_after, build_after_details)
 
@@ -380,11 +660,15 @@ class RpmBuilder:
         if wait_for_event >= 0:
             with Status("Waiting for repository with necessary packages"):
                 session = self.profile.koji_session
+                # Check again quickly at first, in case the repository is about to
+                # be ready, backing off to the usual polling interval
+                delay = REPO_POLL_MIN_INTERVAL
                 while True:
                     repo_info = session.getRepo(package_tag, dist=package_dist_repo)
                     if repo_info["create_event"] >= wait_for_event:
                         break
-                    time.sleep(20)
+                    time.sleep(delay)
+                    delay = min(delay * 1.5, REPO_POLL_MAX_INTERVAL)
 
     def _prompt_for_rebuild(self, manual_packages: Collection[str],
                             to_rebuild: Collection[str], details: Dict[str, Any]):
@@ -446,10 +730,9 @@ class RpmBuilder:
         latest_builds = self._get_latest_builds(to_build)
         build_after = self._compute_build_order(latest_builds, include_localrepo=False)
 
-        target = self.profile.get_rpm_koji_target(self.context.release)
         builder = KojiBuildScheduler(
             profile=self.profile,
-            target=target,
+            target=self._rpm_target,
             build_after=build_after
         )
 
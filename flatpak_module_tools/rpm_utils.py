@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from functools import cached_property, total_ordering
+from operator import itemgetter
 from pathlib import Path
 import re
 from typing import Optional, Union
@@ -16,36 +17,51 @@ def _get_ts(root: Path):
     return ts
 
 
-def create_rpm_manifest(root: Path, restrict_to: Optional[Path] = None):
-    if restrict_to:
-        prefix = "/" + str(restrict_to.relative_to(root)) + "/"
-    else:
-        prefix = None
+# Characters with a special meaning in POSIX extended regular expressions
+_ERE_SPECIAL_RE = re.compile(r'([.\[\]()*+?{}|^$\\])')
+
+
+_MANIFEST_QUERYFORMAT = "\t".join(
+    f"%{{{tag}}}"
+    for tag in ("name", "epoch", "version", "release", "arch", "sigmd5", "size", "buildtime")
+)
 
+
+def create_rpm_manifest(root: Path, restrict_to: Optional[Path] = None):
     ts = _get_ts(root)
     matched = []
 
     mi = ts.dbMatch()
+    if restrict_to:
+        prefix = "/" + str(restrict_to.relative_to(root)) + "/"
+        # Have rpm skip non-matching headers while iterating, rather than
+        # building a Python list of every directory in every package
+        mi.pattern('dirnames', rpm.RPMMIRE_REGEX,  # type: ignore
+                   "^" + _ERE_SPECIAL_RE.sub(r"\\\1", prefix))
+
     for h in mi:
-        if prefix is None or any(d.startswith(prefix) for d in h['dirnames']):
-            if h['sigmd5'] is None:  # imported key rather than a package
-                continue
-            item = {
-                'name': h['name'],
-                'version': h['version'],
-                'release': h['release'],
-                'arch': h['arch'],
-                'payloadhash': h['sigmd5'].hex(),
-                'size': h['size'],
-                'buildtime': h['buildtime']
-            }
-
-            if h['epoch'] is not None:
-                item['epoch'] = h['epoch']
-
-            matched.append(item)
-
-    matched.sort(key=lambda i: (i['name'], i['arch']))
+        # Fetch all the tags with one call into rpm; binary tags like sigmd5
+        # are formatted as hex, and missing tags as (none)
+        name, epoch, version, release, arch, sigmd5, size, buildtime = \
+            h.sprintf(_MANIFEST_QUERYFORMAT).split("\t")
+        if sigmd5 == "(none)":  # imported key rather than a package
+            continue
+        item = {
+            'name': name,
+            'version': version,
+            'release': release,
+            'arch': arch,
+            'payloadhash': sigmd5,
+            'size': int(size),
+            'buildtime': int(buildtime)
+        }
+
+        if epoch != "(none)":
+            item['epoch'] = int(epoch)
+
+        matched.append(item)
+
+    matched.sort(key=itemgetter('name', 'arch'))
     return matched
 
 
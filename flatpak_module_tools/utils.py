@@ -1,22 +1,28 @@
 import codecs
 from contextlib import contextmanager
 from dataclasses import dataclass
+import filecmp
 import functools
-import hashlib
 import logging
 import os
 from tempfile import NamedTemporaryFile
 import shlex
 import subprocess
 import sys
-from typing import IO, Optional, NoReturn, cast
+from typing import IO, Dict, Optional, NoReturn, cast
 
 import click
 
 
+_ERROR_PREFIX = click.style('error: ', fg='red', bold=True)
+_WARNING_PREFIX = click.style('warning: ', fg='yellow', bold=True)
+_INFO_PREFIX = click.style('info: ', fg='blue', bold=True)
+_VERBOSE_PREFIX = click.style('verbose: ', fg='black', bold=True)
+_RUNNING_PREFIX = click.style('running: ', fg='blue', bold=True)
+
+
 def error(msg):
-    click.secho('error: ', fg='red', bold=True, err=True, nl=False)
-    click.echo(msg, err=True)
+    click.echo(_ERROR_PREFIX + str(msg), err=True)
 
 
 def die(msg) -> NoReturn:
@@ -25,8 +31,7 @@ def die(msg) -> NoReturn:
 
 
 def warn(msg):
-    click.secho('warning: ', fg='yellow', bold=True, err=True, nl=False)
-    click.echo(msg, err=True)
+    click.echo(_WARNING_PREFIX + str(msg), err=True)
 
 
 def important(msg):
@@ -34,31 +39,28 @@ def important(msg):
 
 
 def info(msg):
-    click.secho('info: ', fg='blue', bold=True, err=True, nl=False)
-    click.echo(msg, err=True)
+    click.echo(_INFO_PREFIX + str(msg), err=True)
 
 
 def verbose(msg):
-    if logging.root.level <= logging.INFO:
-        click.secho('verbose: ', fg='black', bold=True, err=True, nl=False)
-        click.echo(msg, err=True)
+    if logging.root.isEnabledFor(logging.INFO):
+        click.echo(_VERBOSE_PREFIX + str(msg), err=True)
 
 
 def header(msg):
-    important(msg)
-    important('=' * len(msg))
+    important(msg + '\n' + '=' * len(msg))
 
 
 def log_call(args):
-    click.secho('running: ', fg='blue', bold=True, err=True, nl=False)
-    click.echo(' '.join(shlex.quote(str(a)) for a in args), err=True)
+    click.echo(_RUNNING_PREFIX + shlex.join(str(a) for a in args), err=True)
 
 
 def check_call(args, cwd=None, stdout=None):
     log_call(args)
-    rv = subprocess.call(args, cwd=cwd, stdout=stdout)
-    if rv != 0:
-        die(f"{args[0]} failed (exit status={rv})")
+    try:
+        subprocess.run(args, cwd=cwd, stdout=stdout, check=True)
+    except subprocess.CalledProcessError as e:
+        die(f"{args[0]} failed (exit status={e.returncode})")
 
 
 @dataclass
@@ -70,12 +72,21 @@ class RuntimeInfo:
 
 @functools.lru_cache(maxsize=None)
 def _get_rpm_arch():
-    return subprocess.check_output(
-        ["rpm", "--eval", "%{_arch}"], universal_newlines=True,
-    ).strip()
+    # The rpm bindings avoid running a subprocess, but not everything that
+    # imports this module needs them, so fall back to the command line tool
+    try:
+        import rpm
+    except ImportError:
+        return subprocess.check_output(
+            ["rpm", "--eval", "%{_arch}"], universal_newlines=True,
+        ).strip()
+
+    return rpm.expandMacro("%{_arch}")
 
 
 class Arch:
+    __slots__ = ('name', 'oci', 'flatpak', 'rpm')
+
     name: str
     oci: str
     flatpak: str
@@ -87,6 +98,11 @@ class Arch:
     S390X: "Arch"
     TESTARCH: "Arch"
 
+    # Lookup tables from each kind of architecture name, filled in by _add()
+    _by_oci: Dict[Optional[str], "Arch"] = {}
+    _by_flatpak: Dict[Optional[str], "Arch"] = {}
+    _by_rpm: Dict[Optional[str], "Arch"] = {}
+
     def __new__(cls, *,
                 oci: Optional[str] = None,
                 flatpak: Optional[str] = None,
@@ -95,12 +111,12 @@ class Arch:
         if flatpak is None and oci is None and rpm is None:
             rpm = _get_rpm_arch()
 
-        for v in cls.__dict__.values():
-            if isinstance(v, Arch) and (v.oci == oci or v.flatpak == flatpak or v.rpm == rpm):
-                return v
-        else:
+        result = cls._by_oci.get(oci) or cls._by_flatpak.get(flatpak) or cls._by_rpm.get(rpm)
+        if result is None:
             raise KeyError(f"Can't find Arch(flatpak={flatpak}, oci={oci}, rpm={rpm})")
 
+        return result
+
     @classmethod
     def _add(cls, name: str, flatpak: str, oci: str, rpm: str):
         obj = object.__new__(cls)
@@ -109,6 +125,9 @@ class Arch:
         obj.flatpak = flatpak
         obj.rpm = rpm
         setattr(cls, name, obj)
+        cls._by_oci[oci] = obj
+        cls._by_flatpak[flatpak] = obj
+        cls._by_rpm[rpm] = obj
 
     def __repr__(self):
         return f"Arch.{self.name}"
@@ -125,7 +144,12 @@ Arch._add("TESTARCH", "testarch_flatpak", "testarch_oci", "testarch_rpm")
 
 
 def rpm_name_only(rpm_name):
-    return rpm_name.rsplit("-", 2)[0]
+    # Same as rpm_name.rsplit("-", 2)[0], without building a list
+    head, sep, _ = rpm_name.rpartition("-")
+    if not sep:
+        return rpm_name
+    name, sep, _ = head.rpartition("-")
+    return name if sep else head
 
 
 @contextmanager
@@ -144,16 +168,11 @@ def atomic_writer(output_path):
         # We don't overwrite unchanged files, so that the modtime and
         # httpd-computed ETag stay the same.
 
+        # filecmp compares the sizes first, then the contents block by block,
+        # stopping at the first difference.
         changed = True
         if os.path.exists(output_path):
-            h1 = hashlib.sha256()
-            with open(output_path, "rb") as f:
-                h1.update(f.read())
-            h2 = hashlib.sha256()
-            with open(tmpfile.name, "rb") as f:
-                h2.update(f.read())
-
-            if h1.digest() == h2.digest():
+            if filecmp.cmp(output_path, tmpfile.name, shallow=False):
                 changed = False
 
         if changed:
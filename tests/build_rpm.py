@@ -1,15 +1,19 @@
+import fcntl
+import hashlib
 from pathlib import Path
+import shutil
+from string import Template
 import subprocess
 from tempfile import TemporaryDirectory
 from typing import Optional
 
 
-TEMPLATE_SPEC = """
-Name:           {name}
-Version:        {version}
-Release:        {release}
+TEMPLATE_SPEC = Template("""
+Name:           ${name}
+Version:        ${version}
+Release:        ${release}
 Summary:        Very small RPM
-{epoch}
+${epoch}
 
 License:        MIT
 
@@ -23,31 +27,19 @@ Very small RPM.
 %build
 
 %install
-mkdir -p %{{buildroot}}{prefix}/share/doc/{name}
-echo "HELLO" > %{{buildroot}}{prefix}/share/doc/{name}/HELLO
+mkdir -p %{buildroot}${prefix}/share/doc/${name}
+echo "HELLO" > %{buildroot}${prefix}/share/doc/${name}/HELLO
 
 %files
-{prefix}/share/doc/{name}
+${prefix}/share/doc/${name}
 
 %changelog
 * Fri Jun 16 2023 Owen Taylor <otaylor@redhat.com - 1-1
 - Created
-"""
+""")
 
 
-def build_rpm(path: Path, *,
-              name: str, version: str, release: str,
-              epoch: Optional[str] = None,
-              prefix: Optional[str] = "/usr"):
-
-    spec = TEMPLATE_SPEC.format(
-        name=name,
-        version=version,
-        release=release,
-        prefix=prefix,
-        epoch=f"Epoch: {epoch}" if epoch else ""
-    )
-
+def _rpmbuild(path: Path, name: str, spec: str) -> Path:
     specpath = path / f"{name}.spec"
     with open(specpath, "w") as f:
         f.write(spec)
@@ -69,3 +61,40 @@ def build_rpm(path: Path, *,
         temp_result.rename(result)
 
     return result
+
+
+def build_rpm(path: Path, *,
+              name: str, version: str, release: str,
+              epoch: Optional[str] = None,
+              prefix: Optional[str] = "/usr",
+              cache_dir: Optional[Path] = None):
+
+    spec = TEMPLATE_SPEC.substitute(
+        name=name,
+        version=version,
+        release=release,
+        prefix=prefix,
+        epoch=f"Epoch: {epoch}" if epoch else ""
+    )
+
+    if cache_dir is None:
+        return _rpmbuild(path, name, spec)
+
+    # Built RPMs are stored in cache_dir keyed by the spec file contents,
+    # so that rebuilding an identical RPM is just a copy. Holding a lock while
+    # checking and building means that when pytest-xdist workers share the
+    # cache, only one of them builds each RPM and the others wait for it.
+    cache_subdir = cache_dir / hashlib.sha256(spec.encode("utf-8")).hexdigest()
+    cache_subdir.mkdir(parents=True, exist_ok=True)
+    with open(cache_subdir / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        cached = next(cache_subdir.glob("*.rpm"), None)
+        if cached is None:
+            result = _rpmbuild(path, name, spec)
+            shutil.copy(result, cache_subdir / result.name)
+            return result
+
+    result = path / cached.name
+    shutil.copy(cached, result)
+    return result
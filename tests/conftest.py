@@ -0,0 +1,50 @@
+import hashlib
+from pathlib import Path
+import shutil
+import subprocess
+
+import pytest
+
+from . import build_rpm
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "container_yaml(text): contents of container.yaml for the test"
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    # Keep cached koji results from leaking between tests or into ~/.cache
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+
+
+def _rpm_version():
+    try:
+        return subprocess.check_output(["rpm", "--version"], encoding="utf-8")
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+@pytest.fixture(scope="session")
+def rpm_cache_dir(request, tmp_path_factory):
+    # Test RPMs built with build_rpm() are kept in pytest's cache directory,
+    # so that later runs, and all the pytest-xdist workers of a run, can reuse
+    # them; "pytest --cache-clear" removes them. The key covers build_rpm.py
+    # and the rpm version, so changing either starts afresh.
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        # The cacheprovider plugin is disabled; only share within this process
+        return tmp_path_factory.mktemp("rpmcache")
+
+    key = hashlib.sha1(
+        Path(build_rpm.__file__).read_bytes() + _rpm_version().encode("utf-8")
+    ).hexdigest()
+
+    parent = cache.mkdir("build_rpm")
+    for old in parent.iterdir():
+        if old.name != key:
+            shutil.rmtree(old, ignore_errors=True)
+
+    return parent / key
@@ -27,8 +27,10 @@ sdk=org.fedoraproject.Sdk/aarch64/f39
 BUILDS = [{
     "build_id": ID.BUILD_FLATPAK_RUNTIME,
     "nvr": "flatpak-runtime-f39-1",
+    "state": 1,  # COMPLETE
     "_archives": [{
         "id": ID.ARCHIVE_FLATPAK_RUNTIME_PPC64LE,
+        "btype": "image",
         "extra": {
             "docker": {
                 "config": {
@@ -113,6 +115,7 @@ TAGS = [{
         "name": "flatpak-runtime",
         "nvr": "flatpak-runtime-f39-1",
         "release": "f39",
+        "state": 1,  # COMPLETE
         "version": "1",
     }]
 }]
@@ -127,44 +130,59 @@ TARGETS = [{
 }]
 
 
+TAGS_BY_NAME_OR_ID = {
+    key: tag for tag in TAGS for key in (tag["taginfo"]["name"], tag["taginfo"]["id"])
+}
+# Several tags can share a repo - the first tag listed wins
+REPOS_BY_ID = {tag["repo"]["id"]: tag["repo"] for tag in reversed(TAGS) if "repo" in tag}
+BUILDS_BY_ID_OR_NVR = {
+    key: build for build in BUILDS for key in (build["build_id"], build["nvr"])
+}
+ARCHIVES_BY_ID = {
+    archive["id"]: archive for build in BUILDS for archive in build["_archives"]
+}
+TARGETS_BY_NAME = {target["name"]: target for target in TARGETS}
+
+
 class MockKojiSession:
     def _find_tag(self, name_or_id):
-        for tag in TAGS:
-            if (tag["taginfo"]["name"] == name_or_id or tag["taginfo"]["id"] == name_or_id):
-                return tag
-        raise RuntimeError(f"Unknown tag '{name_or_id}'")
+        try:
+            return TAGS_BY_NAME_OR_ID[name_or_id]
+        except KeyError:
+            raise RuntimeError(f"Unknown tag '{name_or_id}'") from None
 
     def repoInfo(self, repo_id):
-        for tag in TAGS:
-            if "repo" in tag and tag["repo"]["id"] == repo_id:
-                return tag["repo"]
-        raise RuntimeError(f"Unknown repo_id '{repo_id}'")
+        try:
+            return REPOS_BY_ID[repo_id]
+        except KeyError:
+            raise RuntimeError(f"Unknown repo_id '{repo_id}'") from None
 
     def getBuild(self, id_or_nvr):
-        for build in BUILDS:
-            if build["build_id"] == id_or_nvr or build["nvr"] == id_or_nvr:
-                return build
-        raise RuntimeError(f"Unknown build '{id_or_nvr}'")
+        try:
+            return BUILDS_BY_ID_OR_NVR[id_or_nvr]
+        except KeyError:
+            raise RuntimeError(f"Unknown build '{id_or_nvr}'") from None
 
     def getBuildTarget(self, target_name):
-        for target in TARGETS:
-            if target["name"] == target_name:
-                return target
-        raise RuntimeError(f"Unknown target '{target_name}'")
+        try:
+            return TARGETS_BY_NAME[target_name]
+        except KeyError:
+            raise RuntimeError(f"Unknown target '{target_name}'") from None
 
     def getBuildConfig(self, tag_name):
         return self._find_tag(tag_name)["build_config"]
 
-    def listArchives(self, buildID):
-        for build in BUILDS:
-            if build["build_id"] == buildID:
-                return build["_archives"]
+    def listArchives(self, buildID, type=None):
+        build = BUILDS_BY_ID_OR_NVR.get(buildID)
+        if build is not None:
+            return [
+                a for a in build["_archives"] if type is None or a["btype"] == type
+            ]
 
     def listRPMs(self, imageID):
-        for build in BUILDS:
-            for archive in build["_archives"]:
-                if archive["id"] == imageID:
-                    return archive["_rpms"]
+        archive = ARCHIVES_BY_ID.get(imageID)
+        if archive is not None:
+            return archive["_rpms"]
 
     def listTagged(self, tag_name, package, latest=False, inherit=False):
         tag = self._find_tag(tag_name)
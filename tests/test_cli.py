@@ -4,8 +4,8 @@ and mock out the actual building, installation, etc. They are not end-to-end tes
 """
 
 from pathlib import Path
+import shutil
 import subprocess
-from textwrap import dedent
 from unittest import mock
 
 from click.testing import CliRunner
@@ -19,7 +19,7 @@ from flatpak_module_tools.flatpak_builder import FLATPAK_METADATA_BOTH, FLATPAK_
 from .mock_koji import make_config
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def profile():
     return make_config().profiles["production"]
 
@@ -53,35 +53,82 @@ flatpak:
 """
 
 
-@pytest.fixture
-def repo_path(request, tmp_path: Path):
+EMPTY_REPOMD_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo" xmlns:rpm="http://linux.duke.edu/metadata/rpm">
+</repomd>
+"""
+
+
+CUSTOM_PROFILE_CONFIG = """\
+profiles:
+    custom:
+        koji_profile: custom
+"""
+
+
+def _get_container_yaml(request):
     marker = request.node.get_closest_marker("container_yaml")
     if marker:
-        container_yaml = marker.args[0]
+        return marker.args[0]
     else:
-        container_yaml = APP_CONTAINER_YAML
+        return APP_CONTAINER_YAML
+
+
+@pytest.fixture
+def repo_path(request, tmp_path: Path):
+    container_yaml = _get_container_yaml(request)
 
     work_path = tmp_path / "eog"
     work_path.mkdir()
-    with open(work_path / "container.yaml", "w") as f:
-        f.write(container_yaml)
+    (work_path / "container.yaml").write_text(container_yaml)
 
     return work_path
 
 
-@pytest.fixture
-def repo_path_git(tmp_path: Path, repo_path: Path):
-    def CC(*args):
-        subprocess.check_call(args, cwd=repo_path)
+@pytest.fixture(scope="session")
+def git_checkout_templates(tmp_path_factory):
+    # Creating a git repository and cloning it takes a handful of git
+    # subprocesses, so do it once per distinct container.yaml, and have
+    # repo_path_git copy the resulting checkout
+    templates = {}
+
+    def get_template(container_yaml):
+        if container_yaml in templates:
+            return templates[container_yaml]
+
+        template_path = tmp_path_factory.mktemp("git_template")
+        origin_path = template_path / "eog"
+        origin_path.mkdir()
+        (origin_path / "container.yaml").write_text(container_yaml)
+
+        def CC(*args):
+            subprocess.check_call(args, cwd=origin_path)
+
+        CC("git", "init", "-b", "stable")
+        CC("git", "config", "user.name", "Jenny Doe")
+        CC("git", "config", "user.email", "jenny.doe@example.com")
+        CC("git", "add", "container.yaml")
+        CC("git", "commit", "-m", "Initial import")
 
-    CC("git", "init", "-b", "stable")
-    CC("git", "config", "user.name", "Jenny Doe")
-    CC("git", "config", "user.email", "jenny.doe@example.com")
-    CC("git", "add", "container.yaml")
-    CC("git", "commit", "-m", "Initial import")
+        result = template_path / "eog_checkout"
+        subprocess.check_call(["git", "clone", "file://" + str(origin_path), result])
+
+        templates[container_yaml] = result
+        return result
+
+    return get_template
+
+
+@pytest.fixture
+def repo_path_git(request, tmp_path: Path, git_checkout_templates):
+    template = git_checkout_templates(_get_container_yaml(request))
 
     result = tmp_path / "eog_checkout"
-    subprocess.check_call(["git", "clone", "file://" + str(repo_path), result])
+    shutil.copytree(template, result, symlinks=True)
+    # The copied files have new inodes and ctimes, so the stat information
+    # in the index must be refreshed before git considers the tree clean
+    subprocess.check_call(["git", "update-index", "-q", "--refresh"], cwd=result)
 
     return result
 
@@ -92,24 +139,47 @@ def fixed_arch():
         yield
 
 
-@pytest.fixture
-def rpm_builder_mock():
+@pytest.fixture(scope="module")
+def _module_rpm_builder_mock():
     with mock.patch("flatpak_module_tools.cli.RpmBuilder", spec_set=True) as m:
         yield m
 
 
-@pytest.fixture
-def container_builder_mock():
+@pytest.fixture(scope="module")
+def _module_container_builder_mock():
     with mock.patch("flatpak_module_tools.cli.ContainerBuilder", spec_set=True) as m:
         yield m
 
 
-@pytest.fixture
-def installer_mock():
+@pytest.fixture(scope="module")
+def _module_installer_mock():
     with mock.patch("flatpak_module_tools.cli.Installer", spec_set=True) as m:
         yield m
 
 
+def _reset_mock(m):
+    m.reset_mock()
+    # Drop return values configured on the instance by a previous test, but
+    # keep the instance mock itself, since it carries the spec
+    m.return_value.reset_mock(return_value=True, side_effect=True)
+    return m
+
+
+@pytest.fixture
+def rpm_builder_mock(_module_rpm_builder_mock):
+    return _reset_mock(_module_rpm_builder_mock)
+
+
+@pytest.fixture
+def container_builder_mock(_module_container_builder_mock):
+    return _reset_mock(_module_container_builder_mock)
+
+
+@pytest.fixture
+def installer_mock(_module_installer_mock):
+    return _reset_mock(_module_installer_mock)
+
+
 @pytest.fixture
 def isolated_config():
     def reset_config():
@@ -122,9 +192,12 @@ def isolated_config():
     reset_config()
 
 
+# CliRunner keeps no state between invocations, so a single one is shared
+RUNNER = CliRunner()
+
+
 def expect_success(args):
-    runner = CliRunner()
-    result = runner.invoke(
+    result = RUNNER.invoke(
         cli, args, catch_exceptions=False
     )
 
@@ -133,8 +206,7 @@ def expect_success(args):
 
 
 def expect_error(args, expected_message, exit_failure=True):
-    runner = CliRunner()
-    result = runner.invoke(
+    result = RUNNER.invoke(
         cli, args, catch_exceptions=False
     )
 
@@ -152,11 +224,7 @@ def test_global_options(rpm_builder_mock, repo_path, tmp_path):
     config_file = tmp_path / "custom.conf"
 
     with open(config_file, "w") as f:
-        f.write(dedent("""\
-            profiles:
-                custom:
-                    koji_profile: custom
-        """))
+        f.write(CUSTOM_PROFILE_CONFIG)
 
     expect_success([
         "--path", repo_path,
@@ -182,9 +250,10 @@ def test_global_options_bad_profile(rpm_builder_mock, repo_path, tmp_path):
 
 
 def test_local_repo_option(rpm_builder_mock, container_builder_mock, tmp_path, repo_path):
+    # The CLI only checks that repodata/repomd.xml exists
     local_repo = tmp_path / "rpms"
-    local_repo.mkdir()
-    subprocess.check_call(["createrepo_c", "--general-compress-type=gz", local_repo])
+    (local_repo / "repodata").mkdir(parents=True)
+    (local_repo / "repodata/repomd.xml").write_text(EMPTY_REPOMD_XML)
 
     expect_success([
         "--path", repo_path,
@@ -310,8 +379,6 @@ def test_target_git_branch_nonnumeric(rpm_builder_mock, repo_path_git):
 def test_build_container(watch_koji_task_mock: mock.Mock,
                          rpm_builder_mock: mock.Mock,
                          repo_path_git, profile, cli_options, test_flags):
-    runner = CliRunner()
-
     with mock.patch("flatpak_module_tools.cli.get_profile", return_value=profile), \
          mock.patch.object(profile.koji_session, "logged_in", True, create=True), \
          mock.patch.object(profile.koji_session, "flatpakBuild", create=True, return_value=42) \
@@ -320,7 +387,7 @@ def test_build_container(watch_koji_task_mock: mock.Mock,
         if "fail" in test_flags:
             watch_koji_task_mock.return_value = False
 
-        result = runner.invoke(
+        result = RUNNER.invoke(
             cli,
             ["--path", repo_path_git, "build-container"] + cli_options,
             catch_exceptions=False)
@@ -442,25 +509,15 @@ def test_assemble_auto(container_builder_mock, repo_path):
     )
 
 
-def test_installer(installer_mock):
-    expect_success(["install", "./foo.oci.tar"])
-    installer_mock.return_value.set_source_path.assert_called_once_with("./foo.oci.tar")
-    installer_mock.return_value.install.assert_called_once_with()
-    installer_mock.reset_mock()
-
-    expect_success(["install", "https://example.com/foo.oci.tar"])
-    installer_mock.return_value.set_source_url.assert_called_once_with(
-        "https://example.com/foo.oci.tar"
-    )
-    installer_mock.return_value.install.assert_called_once_with()
-    installer_mock.reset_mock()
-
-    expect_success(["install", "--koji", "eog:stable"])
-    installer_mock.return_value.set_source_koji_name_stream.assert_called_once_with(
-        "eog:stable"
-    )
+@pytest.mark.parametrize('args,method_name,source', [
+    (["./foo.oci.tar"], "set_source_path", "./foo.oci.tar"),
+    (["https://example.com/foo.oci.tar"], "set_source_url", "https://example.com/foo.oci.tar"),
+    (["--koji", "eog:stable"], "set_source_koji_name_stream", "eog:stable"),
+])
+def test_installer(installer_mock, args, method_name, source):
+    expect_success(["install"] + args)
+    getattr(installer_mock.return_value, method_name).assert_called_once_with(source)
     installer_mock.return_value.install.assert_called_once_with()
-    installer_mock.reset_mock()
 
 
 @pytest.mark.usefixtures("fixed_arch")
@@ -5,44 +5,6 @@ from flatpak_module_tools.container_spec import ContainerSpec, ValidationError
 from flatpak_module_tools.utils import Arch
 
 
-APP_CONTAINER_YAML = """\
-flatpak:
-    appdata-license: GPL-3.0-or-later AND CC0-1.0
-    appstream-compose: False
-    branch: unstable
-    cleanup-commands: |
-        GDK_PIXBUF_MODULEDIR=/app/lib64/gdk-pixbuf-2.0/2.10.0/loaders/ \
-            gdk-pixbuf-query-loaders-64 > /app/lib64/gdk-pixbuf-2.0/2.10.0/loaders.cache
-        gdk-pixbuf-query-loaders-64 >> /app/lib64/gdk-pixbuf-2.0/2.10.0/loaders.cache
-    command: eog
-    component: eog-flatpak-container
-    copy-icon: True
-    desktop-file-name-prefix: org.gnome.
-    desktop-file-name-suffix: .desktop
-    end-of-life: "Too old"
-    end-of-life-rebase: org.gnome.EyeOfNewt
-    finish-args: >-
-        --share=ipc
-        --socket=fallback-x11
-        --socket=wayland
-    id: org.gnome.eog
-    name: eog
-    packages:
-    - eog
-    -   name: libjpeg-superfast
-        platforms:
-            only: x86_64
-    rename-appdata-file: eog.appdata.xml
-    rename-desktop-file: eog.desktop
-    rename-icon: eog.png
-    runtime-name: flatpak-runtime
-    runtime-version: f39
-    tags: ["Image Viewer", "Eye of GNOME"]
-platforms:
-    only: x86_64, aarch64
-    not: aarch64
-"""
-
 APP_CONTAINER_YAML = """\
 flatpak:
     appdata-license: GPL-3.0-or-later AND CC0-1.0
@@ -113,15 +75,14 @@ flatpak:
 """
 
 
-def make_spec(tmp_path, container_yaml):
-    with open(tmp_path / "container.yaml", "w") as f:
-        f.write(container_yaml)
-
-    return ContainerSpec(tmp_path / "container.yaml")
+def make_spec(container_yaml):
+    # The spec is parsed from the string, so the path is only used in error
+    # messages, and no temporary directory is needed
+    return ContainerSpec.from_text(container_yaml, path="container.yaml")
 
 
-def test_app_container_spec(tmp_path):
-    spec = make_spec(tmp_path, APP_CONTAINER_YAML)
+def test_app_container_spec():
+    spec = make_spec(APP_CONTAINER_YAML)
     assert spec.flatpak.app_id == "org.gnome.eog"
     assert spec.flatpak.appdata_license == "GPL-3.0-or-later AND CC0-1.0"
     assert spec.flatpak.appstream_compose is False
@@ -169,8 +130,31 @@ def test_app_container_spec(tmp_path):
     assert not spec.platforms.includes_platform("aarch64")
 
 
-def test_runtime_container_spec(tmp_path):
-    spec = make_spec(tmp_path, RUNTIME_CONTAINER_YAML)
+def test_container_spec_from_file(tmp_path):
+    with open(tmp_path / "container.yaml", "w") as f:
+        f.write(APP_CONTAINER_YAML)
+
+    spec = ContainerSpec(tmp_path / "container.yaml")
+    assert spec.path == tmp_path / "container.yaml"
+    assert spec.flatpak.app_id == "org.gnome.eog"
+
+
+def test_container_spec_independent():
+    spec1 = make_spec(APP_CONTAINER_YAML)
+    spec1.flatpak.packages.clear()
+    spec1.flatpak.tags.append("Changed")
+    spec1.flatpak.app_id = "org.example.Changed"
+
+    spec2 = make_spec(APP_CONTAINER_YAML)
+    assert spec2.flatpak.app_id == "org.gnome.eog"
+    assert [p.name for p in spec2.flatpak.packages] == [
+        "eog", "libtastypng", "libjpeg-superfast"
+    ]
+    assert spec2.flatpak.tags == ["Image Viewer", "Eye of GNOME"]
+
+
+def test_runtime_container_spec():
+    spec = make_spec(RUNTIME_CONTAINER_YAML)
 
     assert spec.flatpak.app_id == "org.fedoraproject.Platform"
     assert spec.flatpak.build_runtime is True
@@ -190,8 +174,8 @@ def test_runtime_container_spec(tmp_path):
     assert spec.flatpak.packages[1].name == "abattis-cantarell-vf-fonts"
 
 
-def test_app_container_spec_modules(tmp_path):
-    spec = make_spec(tmp_path, APP_CONTAINER_YAML_MODULES)
+def test_app_container_spec_modules():
+    spec = make_spec(APP_CONTAINER_YAML_MODULES)
 
     assert spec.compose.modules == ["eog:stable"]
 
@@ -241,7 +225,8 @@ def test_app_container_spec_modules(tmp_path):
      flatpak: {id: org.gnome.eog}
      """),
      (r"is new style \(compose:modules is not set\). "
-      r"Missing keys:\s*flatpak:packages\s*flatpak:runtime-name\s*flatpak:runtime-version")),
+      r"Missing keys:\s*flatpak:packages\s*flatpak:runtime-name"
+      r"\s*flatpak:runtime-version")),
     (dedent("""
      flatpak: {id: org.gnome.eog, build-runtime: True}
      """),
@@ -253,6 +238,6 @@ def test_app_container_spec_modules(tmp_path):
      """),
      r"is old style \(compose:modules is set\). Disallowed keys:\s*flatpak:packages"),
 ])
-def test_invalid_spec(tmp_path, container_yaml, validation_error):
+def test_invalid_spec(container_yaml, validation_error):
     with pytest.raises(ValidationError, match=validation_error):
-        make_spec(tmp_path, container_yaml)
+        make_spec(container_yaml)
@@ -1,4 +1,6 @@
-from io import TextIOWrapper
+import copy
+import functools
+from io import BytesIO, TextIOWrapper
 import json
 import os
 from subprocess import check_call
@@ -20,6 +22,10 @@ gi.require_version('Modulemd', '2.0')
 from gi.repository import Modulemd  # type: ignore  # noqa: E402
 
 
+# Use the libyaml-based loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 FLATPAK_RUNTIME_MMD = """
 document: modulemd
 version: 2
@@ -154,6 +160,11 @@ flatpak:
     end-of-life-rebase: org.fedoraproject.NewPlatform
 """
 
+# Parsed once; each use gets a deep copy, so that nothing one test does to
+# its spec can leak into another
+TESTAPP_CONTAINER = yaml.load(TESTAPP_CONTAINER_YAML, Loader=YAML_LOADER)
+RUNTIME_CONTAINER = yaml.load(RUNTIME_CONTAINER_YAML, Loader=YAML_LOADER)
+
 
 # We repeat the test with different architectures
 #   aarch64: tests that Flatpak translates aarch64 => arm64
@@ -173,9 +184,16 @@ def R(arch):
     return r
 
 
+@functools.lru_cache(maxsize=None)
+def read_module_stream(mmd_yaml):
+    # Parsing modulemd through GObject introspection is slow, and the tests
+    # only read from the resulting streams, so share them between tests
+    return Modulemd.ModuleStream.read_string(mmd_yaml, True)
+
+
 @pytest.fixture
 def runtime_module(R):
-    runtime_mmd = Modulemd.ModuleStream.read_string(FLATPAK_RUNTIME_MMD, True)
+    runtime_mmd = read_module_stream(FLATPAK_RUNTIME_MMD)
     yield ModuleInfo(runtime_mmd.get_module_name(),
                      runtime_mmd.get_stream_name(),
                      runtime_mmd.get_version(),
@@ -188,7 +206,7 @@ def runtime_module(R):
 def testapp_module(arch, R):
     testapp_mmd = TESTAPP_MMD.replace("@ARCH@", arch.rpm)
 
-    testapp_mmd = Modulemd.ModuleStream.read_string(testapp_mmd, True)
+    testapp_mmd = read_module_stream(testapp_mmd)
     yield ModuleInfo(testapp_mmd.get_module_name(),
                      testapp_mmd.get_stream_name(),
                      testapp_mmd.get_version(),
@@ -200,43 +218,50 @@ def testapp_module(arch, R):
 
 @pytest.fixture
 def testapp_source(testapp_module, runtime_module):
-    container_yaml = yaml.safe_load(TESTAPP_CONTAINER_YAML)
-
     modules = {
         'flatpak-runtime': runtime_module,
         'testapp': testapp_module
     }
 
-    yield FlatpakSourceInfo(container_yaml['flatpak'],
+    yield FlatpakSourceInfo(copy.deepcopy(TESTAPP_CONTAINER['flatpak']),
                             modules,
                             testapp_module)
 
 
 @pytest.fixture
 def runtime_source(runtime_module):
-    container_yaml = yaml.safe_load(RUNTIME_CONTAINER_YAML)
-
     modules = {
         'flatpak-runtime': runtime_module,
     }
 
-    yield FlatpakSourceInfo(container_yaml['flatpak'],
+    yield FlatpakSourceInfo(copy.deepcopy(RUNTIME_CONTAINER['flatpak']),
                             modules,
                             runtime_module)
 
 
 def test_source_info_bad_profile(testapp_source):
-    container_yaml = yaml.safe_load(TESTAPP_CONTAINER_YAML)
     with pytest.raises(
                 ValueError,
                 match=r"testapp:stable:3320201216094032 doesn't have a profile 'badprofile'"
             ):
-        FlatpakSourceInfo(container_yaml['flatpak'],
+        FlatpakSourceInfo(copy.deepcopy(TESTAPP_CONTAINER['flatpak']),
                           testapp_source.modules,
                           testapp_source.base_module,
                           profile='badprofile')
 
 
+def make_export_tar(tmpdir, root_name):
+    # Equivalent to 'tar cf - -H pax --sort=name <root_name>' - TarFile.add()
+    # recurses into directories in sorted order. The tarball is kept in
+    # memory and handed straight to the builder.
+    stream = BytesIO()
+    with tarfile.open(fileobj=stream, mode="w", format=tarfile.PAX_FORMAT) as tf:
+        tf.add(tmpdir / root_name, arcname=root_name)
+
+    stream.seek(0)
+    return stream
+
+
 def parse_manifest(lines):
     """A parse_manifest function to pass to FlatpackBuilder. The 'include' filed
     in the returned dictionary is not part of the FlatpakBuilder API ... it
@@ -372,11 +397,9 @@ def test_app_basic(testapp_source, tmpdir, arch, R):
     with open(bindir / "hello", "w") as f:
         os.fchmod(f.fileno(), 0o0755)
 
-    check_call(["tar", "cf", "export.tar", "-H", "pax", "--sort=name",
-                "root"], cwd=tmpdir)
+    export_stream = make_export_tar(tmpdir, "root")
 
-    with open(tmpdir / "export.tar", "rb") as f:
-        outfile, manifest_file = (builder._export_from_stream(f, close_stream=False))
+    outfile, manifest_file = builder._export_from_stream(export_stream, close_stream=False)
 
     ref_name, oci_outdir, tarred_oci_outdir = builder.build_container(outfile)
 
@@ -423,11 +446,9 @@ def test_runtime_basic(runtime_source, tmpdir, arch, R):
     with open(bindir / "hello", "w") as f:
         os.fchmod(f.fileno(), 0o0755)
 
-    check_call(["tar", "cfv", "export.tar", "-H", "pax", "--sort=name",
-                "root"], cwd=tmpdir)
+    export_stream = make_export_tar(tmpdir, "root")
 
-    with open(tmpdir / "export.tar", "rb") as f:
-        outfile, manifest_file = (builder._export_from_stream(f, close_stream=False))
+    outfile, manifest_file = builder._export_from_stream(export_stream, close_stream=False)
 
     refname, oci_outdir, tarred_oci_outdir = builder.build_container(outfile)
 
@@ -478,16 +499,14 @@ def test_export_long_filenames(testapp_source, tmpdir, arch):
     os.link(bindir / verylongname, bindir / "zzzlink2")
     os.link(bindir / veryverylongname, bindir / "zzzlink3")
 
-    check_call(["tar", "cfv", "export.tar", "-H", "pax", "--sort=name",
-                "verylongrootname"], cwd=tmpdir)
+    export_stream = make_export_tar(tmpdir, "verylongrootname")
 
     workdir = str(tmpdir / "work")
     os.mkdir(workdir)
 
     builder = FlatpakBuilder(testapp_source, workdir, "verylongrootname", oci_arch=arch.oci)
 
-    with open(tmpdir / "export.tar", "rb") as f:
-        outfile, manifest_file = (builder._export_from_stream(f, close_stream=False))
+    outfile, manifest_file = builder._export_from_stream(export_stream, close_stream=False)
 
     os.mkdir(tmpdir / "processed")
     check_call(["tar", "xfv", outfile], cwd=tmpdir / "processed")
@@ -508,8 +527,7 @@ def test_usr_etc(runtime_source, tmpdir, arch, add_file):
         with open(tmpdir / "root/usr/etc/hello.txt", "w") as f:
             os.fchmod(f.fileno(), 0o0755)
 
-    check_call(["tar", "cfv", "export.tar", "-H", "pax", "--sort=name",
-                "root"], cwd=tmpdir)
+    export_stream = make_export_tar(tmpdir, "root")
 
     workdir = str(tmpdir / "work")
     os.mkdir(workdir)
@@ -518,8 +536,7 @@ def test_usr_etc(runtime_source, tmpdir, arch, add_file):
                              oci_arch=arch.oci)
 
     def export():
-        with open(tmpdir / "export.tar", "rb") as f:
-            outfile, manifest_file = (builder._export_from_stream(f, close_stream=False))
+        outfile, manifest_file = builder._export_from_stream(export_stream, close_stream=False)
 
     if add_file:
         with pytest.raises(FileMappingError,
@@ -2,31 +2,38 @@
 
 import logging
 import os
+import re
 import tempfile
 from typing import Any, Literal, Optional, overload
 
+import click
 from click.testing import CliRunner
 import pytest
 import responses
 import yaml
 
 from flatpak_module_tools.cli import cli
+from flatpak_module_tools.flatpak_generator import FlatpakGenerator
 
 
 log = logging.getLogger(__name__)
 
+# Use the libyaml-based loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 testfiles_dir = os.path.join(os.path.dirname(__file__), 'files', 'generator')
 
-with open(os.path.join(testfiles_dir, 'apps.json')) as f:
+# Read as bytes, which responses serves without re-encoding for every test
+with open(os.path.join(testfiles_dir, 'apps.json'), 'rb') as f:
     APPS_JSON = f.read()
 
-with open(os.path.join(testfiles_dir, 'eog.yaml')) as f:
+with open(os.path.join(testfiles_dir, 'eog.yaml'), 'rb') as f:
     EOG_YAML = f.read()
 
-with open(os.path.join(testfiles_dir, 'eog.json')) as f:
+with open(os.path.join(testfiles_dir, 'eog.json'), 'rb') as f:
     EOG_JSON = f.read()
 
-with open(os.path.join(testfiles_dir, 'releases.json')) as f:
+with open(os.path.join(testfiles_dir, 'releases.json'), 'rb') as f:
     RELEASES_JSON = f.read()
 
 
@@ -44,35 +51,42 @@ def _generate_flatpak(rpm, flathub=None, runtime_name=None, runtime_version=None
 
 def _generate_flatpak(rpm, flathub=None, runtime_name=None, runtime_version=None,
                       expected_error_output: Optional[str] = None):
-    cmd = ['init']
-    cmd.append(rpm)
-    if flathub:
-        cmd += ['--flathub', flathub]
-
-    prevdir = os.getcwd()
     with tempfile.TemporaryDirectory() as workdir:
-        try:
-            os.chdir(workdir)
-            runner = CliRunner()
-            result = runner.invoke(cli, cmd, catch_exceptions=False)
-            if expected_error_output is not None:
-                assert result.exit_code != 0
-                assert expected_error_output in result.output
-                return
-            else:
-                assert result.exit_code == 0
+        # Write to an explicit path, rather than changing the working
+        # directory of the whole test process
+        output_path = os.path.join(workdir, 'container.yaml')
+
+        cmd = ['init', '--output-containerspec', output_path]
+        cmd.append(rpm)
+        if flathub:
+            cmd += ['--flathub', flathub]
+
+        runner = CliRunner()
+        result = runner.invoke(cli, cmd, catch_exceptions=False)
+        if expected_error_output is not None:
+            assert result.exit_code != 0
+            assert expected_error_output in result.output
+            return
+        else:
+            assert result.exit_code == 0
 
-            with open('container.yaml') as f:
-                contents = f.read()
+        with open(output_path) as f:
+            contents = f.read()
 
-            log.info('container.yaml:\n%s\n', contents)
-            container_yaml = yaml.safe_load(contents)
-        finally:
-            os.chdir(prevdir)
+        log.info('container.yaml:\n%s\n', contents)
+        container_yaml = yaml.load(contents, Loader=YAML_LOADER)
 
     return container_yaml
 
 
+def _generate_flatpak_direct(output_path, rpm, flathub=None):
+    # Skips the click layer, which test_generated_flatpak_files covers
+    FlatpakGenerator(rpm).run(str(output_path), flathub=flathub)
+
+    with open(output_path) as f:
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
 class TestFlatpak(object):
     @pytest.mark.filterwarnings('ignore::DeprecationWarning:koji')
     @pytest.mark.filterwarnings('ignore::PendingDeprecationWarning:koji')
@@ -93,7 +107,7 @@ class TestFlatpak(object):
                                  ('notexist', 'yaml',
                                   'No match found on flathub.org'),
                              ])
-    def test_flatpak_from_flathub(self, search_term, extension,
+    def test_flatpak_from_flathub(self, tmp_path, search_term, extension,
                                   expected_error):
         responses.add(responses.GET, 'https://flathub.org/api/v1/apps',
                       body=APPS_JSON, content_type='application/json')
@@ -116,10 +130,9 @@ class TestFlatpak(object):
                               f"{base}/{app_id}/master/{app_id}.{ext}",
                               body='Not found', status=404)
 
+        output_path = tmp_path / "container.yaml"
         if expected_error is None:
-            container_yaml = \
-                _generate_flatpak('eog',
-                                  flathub=search_term)
+            container_yaml = _generate_flatpak_direct(output_path, 'eog', flathub=search_term)
 
             f = container_yaml['flatpak']
 
@@ -134,5 +147,5 @@ class TestFlatpak(object):
             assert f['finish-args'] == '--share=ipc\n--socket=x11'
             assert f['packages'][0] == 'eog'
         else:
-            _generate_flatpak('eog', flathub=search_term,
-                              expected_error_output=expected_error)
+            with pytest.raises(click.ClickException, match=re.escape(expected_error)):
+                _generate_flatpak_direct(output_path, 'eog', flathub=search_term)
@@ -1,4 +1,5 @@
 from pathlib import Path
+import shutil
 import subprocess
 
 import click
@@ -24,9 +25,26 @@ def source_repo_path(tmp_path_factory) -> Path:
     return repo_path
 
 
+@pytest.fixture(scope="session")
+def cloned_repo_path(tmp_path_factory, source_repo_path) -> Path:
+    clone_parent = tmp_path_factory.mktemp("cloned-repo")
+    subprocess.check_call(["git", "clone", source_repo_path, "repo"], cwd=clone_parent)
+
+    # Set up the identity once here, so tests that commit don't need to
+    repo = GitRepository(clone_parent / "repo")
+    repo._git_output(["config", "user.name", "Jenny Doe"])
+    repo._git_output(["config", "user.email", "jenny.doe@example.com"])
+
+    return repo.path
+
+
 @pytest.fixture
-def repo(tmp_path, source_repo_path) -> GitRepository:
-    subprocess.check_call(["git", "clone", source_repo_path, "repo"], cwd=tmp_path)
+def repo(tmp_path, cloned_repo_path) -> GitRepository:
+    # Copying a clone made once per session is much cheaper than cloning;
+    # the copied files have new inodes and ctimes, so the index needs
+    # a refresh before git considers the tree clean.
+    shutil.copytree(cloned_repo_path, tmp_path / "repo", symlinks=True)
+    subprocess.check_call(["git", "update-index", "-q", "--refresh"], cwd=tmp_path / "repo")
 
     return GitRepository(tmp_path / "repo")
 
@@ -38,8 +56,6 @@ def test_git_repository_branch(repo: GitRepository):
 def test_git_repository_branch_none(repo: GitRepository):
     with open(repo.path / "README.md", "w") as f:
         f.write("New contents")
-    repo._git_output(["config", "user.name", "Jenny Doe"])
-    repo._git_output(["config", "user.email", "jenny.doe@example.com"])
     repo._git_output(["commit", "-a", "-m", "Update README"])
     repo._git_output(["checkout", "HEAD^"])
 
@@ -83,8 +99,6 @@ def test_git_repository_check_clean(repo: GitRepository):
                        match=r"Git repository has uncommitted changes"):
         repo.check_clean()
 
-    repo._git_output(["config", "user.name", "Jenny Doe"])
-    repo._git_output(["config", "user.email", "jenny.doe@example.com"])
     repo._git_output(["commit", "-a", "-m", "Update README"])
 
     repo = GitRepository(repo.path)  # reset cached properties
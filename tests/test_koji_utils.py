@@ -1,9 +1,15 @@
 from textwrap import dedent
+from unittest.mock import patch
+
+import koji
 import pytest
 from flatpak_module_tools.config import ProfileConfig
-from flatpak_module_tools.koji_utils import KojiRepo
+from flatpak_module_tools.koji_utils import (
+    KojiRepo, cached_koji_call, list_image_archives, load_cached_koji_result,
+    store_cached_koji_result
+)
 
-from .mock_koji import ID, make_config
+from .mock_koji import ID, MockKojiSession, make_config
 
 
 @pytest.fixture
@@ -70,3 +76,59 @@ def test_repo_from_koji_repo_id(profile: ProfileConfig):
         enabled=1
         skip_if_unavailable=False
     """)
+
+
+def test_cached_koji_call(profile: ProfileConfig):
+    with patch.object(MockKojiSession, "getBuildTarget",
+                      return_value={"build_tag_name": "f39-build"}) as mock_call:
+        assert cached_koji_call(profile, "getBuildTarget", "f39") == \
+            {"build_tag_name": "f39-build"}
+        assert cached_koji_call(profile, "getBuildTarget", "f39") == \
+            {"build_tag_name": "f39-build"}
+        assert mock_call.call_count == 1
+
+        # Different arguments are cached separately
+        cached_koji_call(profile, "getBuildTarget", "f40")
+        assert mock_call.call_count == 2
+
+        # An expired entry is refetched
+        cached_koji_call(profile, "getBuildTarget", "f39", ttl=0)
+        assert mock_call.call_count == 3
+
+
+def test_cached_koji_call_empty(profile: ProfileConfig):
+    # None or empty results might be filled in later, so aren't cached
+    with patch.object(MockKojiSession, "getBuildTarget", return_value=None) as mock_call:
+        assert cached_koji_call(profile, "getBuildTarget", "f39") is None
+        assert cached_koji_call(profile, "getBuildTarget", "f39") is None
+        assert mock_call.call_count == 2
+
+
+def test_list_image_archives(profile: ProfileConfig):
+    build = {"build_id": ID.BUILD_FLATPAK_RUNTIME, "state": koji.BUILD_STATES["COMPLETE"]}
+    with patch.object(MockKojiSession, "listArchives",
+                      return_value=[{"id": 1}]) as mock_call:
+        assert list_image_archives(profile, build) == [{"id": 1}]
+        assert list_image_archives(profile, build) == [{"id": 1}]
+        assert mock_call.call_count == 1
+
+        # The archives of a build that isn't complete can still change
+        building = dict(build, state=koji.BUILD_STATES["BUILDING"])
+        list_image_archives(profile, building)
+        list_image_archives(profile, building)
+        assert mock_call.call_count == 3
+
+
+def test_cached_koji_result():
+    server = "https://koji.example.com/kojihub"
+    with pytest.raises(KeyError):
+        load_cached_koji_result(server, ["build_requires", 42])
+
+    store_cached_koji_result(server, ["build_requires", 42], ["gcc", "make"])
+    assert load_cached_koji_result(server, ["build_requires", 42]) == ["gcc", "make"]
+    assert load_cached_koji_result(server, ["build_requires", 42], ttl=None) == ["gcc", "make"]
+
+    with pytest.raises(KeyError):
+        load_cached_koji_result(server, ["build_requires", 42], ttl=0)
+    with pytest.raises(KeyError):
+        load_cached_koji_result("https://other.example.com/kojihub", ["build_requires", 42])
@@ -1,8 +1,8 @@
-from io import BufferedReader, BytesIO, RawIOBase
+from io import BufferedReader, BytesIO
 import gzip
-import subprocess
-from typing import Optional
 
+import createrepo_c as cr
+import requests
 import responses
 import pytest
 
@@ -78,62 +78,65 @@ BASIC_PRIMARY_XML = """\
 </metadata>
 """
 
+# Fast compression is plenty for a test fixture
+BASIC_PRIMARY_XML_GZ = gzip.compress(BASIC_PRIMARY_XML.encode("UTF-8"), compresslevel=1)
 
-# responses looks for specifically for BufferedReader subclass for the body to
-# know if to treat it as a file. BytesIO acts as a buffered reader, but is not
-# a subclass, so this class pretends it's unbuffered so we can wrap it in a
-# BufferedReader. Bah...
-
-class RawBytesReader(RawIOBase):
-    def __init__(self, data):
-        self._reader = BytesIO(data)
-
-    def read(self, size=-1) -> bytes:
-        return self._reader.read(size)
-
-    def readinto(self, __buffer) -> Optional[int]:
-        return self._reader.readinto(__buffer)
-
-    def readable(self) -> bool:
-        return True
 
+# responses looks specifically for a BufferedReader subclass for the body to
+# know if to treat it as a file, so wrap the BytesIO in one.
 
 class StreamingGzippedResponse(responses.CallbackResponse):
-    def __init__(self, method, url, body_str: str, **kwargs):
-        compressed_data = gzip.compress(body_str.encode("UTF-8"))
-
+    def __init__(self, method, url, compressed_data: bytes, **kwargs):
         def callback(request):
             headers = {
                 "Content-Type": "text/xml"
             }
-            return (200, headers, BufferedReader(RawBytesReader(compressed_data)))
+            return (200, headers, BufferedReader(BytesIO(compressed_data)))
 
         super().__init__(method=method, url=url, callback=callback, stream=True, **kwargs)
 
 
-@responses.activate
-def test_package_locator():
-    responses.add(
-        responses.GET, "https://repos.example.com/basic.repo",
-        body=BASIC_REPO
-    )
-    responses.add(
-        responses.GET, "https://repos.example.com/basic-no-baseurl.repo",
-        body=BASIC_NO_BASEURL_REPO
-    )
-    responses.add(
-        responses.GET, "https://repos.example.com/basic/ppc64le/repodata/repomd.xml",
-        body=BASIC_REPODATA_XML
-    )
-    responses.add(
-        responses.GET, "https://repos.example.com/basic-bad/ppc64le/repodata/repomd.xml",
-        body=BASIC_REPODATA_BAD_XML
-    )
-    responses.add(StreamingGzippedResponse(
-        responses.GET, "https://repos.example.com/basic/ppc64le/repodata/HASH-primary.xml.gz",
-        body_str=BASIC_PRIMARY_XML
-    ))
-
+@pytest.fixture(scope="module")
+def http_mock():
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as mock:
+        mock.add(
+            responses.GET, "https://repos.example.com/basic.repo",
+            body=BASIC_REPO
+        )
+        mock.add(
+            responses.GET, "https://repos.example.com/basic-no-baseurl.repo",
+            body=BASIC_NO_BASEURL_REPO
+        )
+        mock.add(
+            responses.GET, "https://repos.example.com/basic/ppc64le/repodata/repomd.xml",
+            body=BASIC_REPODATA_XML
+        )
+        mock.add(
+            responses.GET, "https://repos.example.com/basic-bad/ppc64le/repodata/repomd.xml",
+            body=BASIC_REPODATA_BAD_XML
+        )
+        mock.add(StreamingGzippedResponse(
+            responses.GET, "https://repos.example.com/basic/ppc64le/repodata/HASH-primary.xml.gz",
+            compressed_data=BASIC_PRIMARY_XML_GZ
+        ))
+        mock.add(
+            responses.GET, "https://repos.example.com/huge.repo",
+            body=BASIC_REPO, headers={"Content-Length": "2000000"},
+            auto_calculate_content_length=False
+        )
+
+        yield mock
+
+
+@pytest.fixture
+def http(http_mock):
+    # The registered URLs are shared by the whole module; only the
+    # recorded calls are per-test
+    http_mock.calls.reset()
+    return http_mock
+
+
+def test_package_locator(http):
     # basic operation - find highest version
     locator = PackageLocator()
     locator.add_remote_repofile("https://repos.example.com/basic.repo")
@@ -141,8 +144,17 @@ def test_package_locator():
     assert ver and ver.version == "2.3.6"
 
     # basic operation - no version found
+    # (repository metadata is only downloaded once per locator)
+    num_calls = len(http.calls)
     ver = locator.find_latest_version("glib4", arch=Arch.PPC64LE)
     assert ver is None
+    assert len(http.calls) == num_calls
+
+    # repeated lookups are answered from the locator's cache
+    # (the deprecated session argument is still accepted, and ignored)
+    ver = locator.find_latest_version("glib2", session=requests.Session(), arch=Arch.PPC64LE)
+    assert ver and ver.version == "2.3.6"
+    assert len(http.calls) == num_calls
 
     # Use baseurl input rather than a repo URL
     locator = PackageLocator()
@@ -157,7 +169,15 @@ def test_package_locator():
     ver = locator.find_latest_version("glib2", arch=Arch.PPC64LE)
     assert ver and ver.version == "2.3.6"
     # No easy way to check that the proxies argument actually got used; it's not
-    # reflected in responses.calls[-1].request.
+    # reflected in http.calls[-1].request.
+
+    # Lower priority repositories aren't consulted once a higher priority
+    # repository has a match
+    locator = PackageLocator()
+    locator.add_repo("https://repos.example.com/basic-bad/$basearch/", priority=50)
+    locator.add_repo("https://repos.example.com/basic/$basearch", priority=10)
+    ver = locator.find_latest_version("glib2", arch=Arch.PPC64LE)
+    assert ver and ver.version == "2.3.6"
 
     # Bad repomd.xml
     with pytest.raises(RuntimeError, match=r"Cannot find <data type='primary'/> in repomd.xml"):
@@ -175,13 +195,43 @@ def test_package_locator():
         locator.add_remote_repofile("https://repos.example.com/basic-no-baseurl.repo")
         locator.find_latest_version("glib2", arch=Arch.PPC64LE)
 
+    # Refuse to parse an implausibly large repository file
+    with pytest.raises(
+        RuntimeError,
+        match=r"https://repos.example.com/huge.repo: repository file is too large"
+    ):
+        locator = PackageLocator()
+        locator.add_remote_repofile("https://repos.example.com/huge.repo")
+
 
 @responses.activate
-def test_package_locator_local(tmp_path):
+def test_package_locator_local(tmp_path, rpm_cache_dir):
     repo = tmp_path / "repo"
     repo.mkdir()
-    build_rpm(repo, name="glib2", version="2.3.4", release="1.fc38")
-    subprocess.check_call(["createrepo_c", "--general-compress-type=gz", repo])
+    rpm_path = build_rpm(
+        repo, name="glib2", version="2.3.4", release="1.fc38", cache_dir=rpm_cache_dir
+    )
+
+    # Write just the metadata that the locator reads - repomd.xml and a
+    # gzip-compressed primary.xml - using the createrepo_c library rather than
+    # running the command line tool
+    repodata = repo / "repodata"
+    repodata.mkdir()
+
+    package = cr.package_from_rpm(str(rpm_path))
+    package.location_href = rpm_path.name
+
+    primary_path = repodata / "primary.xml.gz"
+    primary = cr.PrimaryXmlFile(str(primary_path), cr.GZ_COMPRESSION)
+    primary.set_num_of_pkgs(1)
+    primary.add_pkg(package)
+    primary.close()
+
+    record = cr.RepomdRecord("primary", str(primary_path))
+    record.fill(cr.SHA256)
+    repomd = cr.Repomd()
+    repomd.set_record(record)
+    (repodata / "repomd.xml").write_text(repomd.xml_dump())
 
     locator = PackageLocator()
     locator.add_repo(repo)
@@ -206,3 +256,7 @@ def test_extended_version_info():
     assert not vi3 == vi4
 
     assert repr(vi1) == "1.2.3-1, priority=10"
+
+    assert vi1.sort_key > vi2.sort_key
+    assert vi3.sort_key < vi4.sort_key
+    assert max([vi2, vi4, vi3], key=lambda vi: vi.sort_key) is vi4
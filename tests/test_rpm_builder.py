@@ -0,0 +1,115 @@
+import click
+import networkx
+import pytest
+
+from flatpak_module_tools.depchase.cache_paths import get_cached_repomd_path
+from flatpak_module_tools.rpm_builder import (
+    _find_cycles, _has_cycle, _store_depchase_cache, check_for_cycles
+)
+from flatpak_module_tools.utils import Arch
+
+
+def make_details(build_after):
+    return {
+        package: {name: [{"explanation": None}] for name in after}
+        for package, after in build_after.items()
+    }
+
+
+def test_check_for_cycles_none():
+    build_after = {
+        "a": {"b", "c"},
+        "b": {"c"},
+        "c": set(),
+    }
+    check_for_cycles(build_after, make_details(build_after))
+
+
+def test_check_for_cycles(capsys):
+    build_after = {
+        "a": {"b"},
+        "b": {"a"},
+        "c": {"a"},
+    }
+    with pytest.raises(click.ClickException,
+                       match=r"Cannot determine build order because of cycles"):
+        check_for_cycles(build_after, make_details(build_after))
+
+    out = capsys.readouterr().out
+    assert "a ⇒ b" in out or "b ⇒ a" in out
+    assert "c ⇒" not in out
+
+
+def test_check_for_cycles_long():
+    # Longer than the length bound used for the initial search
+    names = [f"p{i}" for i in range(20)]
+    build_after = {
+        name: {names[(i + 1) % len(names)]} for i, name in enumerate(names)
+    }
+    with pytest.raises(click.ClickException,
+                       match=r"Cannot determine build order because of cycles"):
+        check_for_cycles(build_after, make_details(build_after))
+
+
+def test_has_cycle():
+    # Diamonds revisit nodes without a cycle
+    assert not _has_cycle({"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []})
+    assert _has_cycle({"a": ["a"]})
+    assert _has_cycle({"a": ["b"], "b": ["c"], "c": ["b"]})
+
+    # Deep chains don't hit the recursion limit
+    chain = {f"p{i}": [f"p{i + 1}"] for i in range(5000)}
+    chain["p5000"] = []
+    assert not _has_cycle(chain)
+    chain["p5000"] = ["p0"]
+    assert _has_cycle(chain)
+
+
+def test_find_cycles_longer_bounds():
+    # A 2-cycle and a 6-cycle sharing a node: the first, tightly bounded
+    # search finds only the short one, so longer bounds are tried
+    G = networkx.DiGraph()
+    G.add_edges_from([("a", "b"), ("b", "a")])
+    G.add_edges_from([("a", "c1"), ("c1", "c2"), ("c2", "c3"), ("c3", "c4"), ("c4", "c5"),
+                      ("c5", "a")])
+
+    cycles = _find_cycles(G, 25)
+    assert sorted(len(c) for c in cycles) == [2, 6]
+
+
+def test_find_cycles_widest_bound_capped():
+    # Seven 10-cycles through "a": only the widest search finds them, and it
+    # stops once it has as many cycles as are shown to the user
+    G = networkx.DiGraph()
+    for i in range(7):
+        path = ["a"] + [f"p{i}_{j}" for j in range(9)] + ["a"]
+        G.add_edges_from(zip(path, path[1:]))
+
+    cycles = _find_cycles(G, 25)
+    assert len(cycles) == 5
+    assert all(len(c) == 10 for c in cycles)
+
+
+def test_store_depchase_cache(tmp_path):
+    cache_dir = tmp_path / "depchase-cache"
+    old = cache_dir / "resolve-requires-aaaa-1111.json"
+    other = cache_dir / "resolve-requires-bbbb-1111.json"
+    new = cache_dir / "resolve-requires-aaaa-2222.json"
+
+    _store_depchase_cache(old, "OLD")
+    _store_depchase_cache(other, "OTHER")
+    _store_depchase_cache(new, "NEW")
+
+    # The result for the same query against older metadata is replaced
+    assert sorted(p.name for p in cache_dir.iterdir()) == [
+        "resolve-requires-aaaa-2222.json", "resolve-requires-bbbb-1111.json"
+    ]
+    assert new.read_text() == "NEW"
+
+
+def test_cached_repomd_path(tmp_path, monkeypatch):
+    # The location follows XDG_CACHE_HOME at the time of the call
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert get_cached_repomd_path("f39-build", Arch.PPC64LE) == str(
+        tmp_path / "flatpak-module-tools/repos/f39-build/ppc64le/repodata/repomd.xml"
+    )
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import subprocess
 from unittest.mock import ANY
@@ -42,21 +43,23 @@ X55M9nDtzUSayJuEcfFP2c9KQCE=
 """
 
 
-@pytest.fixture(scope='module')
-def rpmroot(tmp_path_factory):
+@pytest.fixture(scope='session')
+def rpmroot(tmp_path_factory, rpm_cache_dir):
     parent = tmp_path_factory.mktemp('rpmroot')
 
     root = parent / "root"
 
-    testrpm = build_rpm(
-        parent, name="testrpm", version="1", release="1", prefix="/app"
-    )
-    testrpm_epoch = build_rpm(
-        parent, name="testrpm-epoch", version="1", release="1", prefix="/app", epoch="1"
-    )
-    testrpm_usr = build_rpm(
-        parent, name="testrpm-usr", version="1", release="1", prefix="/usr"
-    )
+    # The builds are independent rpmbuild processes, so run them at the same time
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        testrpm, testrpm_epoch, testrpm_usr = executor.map(
+            lambda kwargs: build_rpm(parent, version="1", release="1",
+                                     cache_dir=rpm_cache_dir, **kwargs),
+            [
+                dict(name="testrpm", prefix="/app"),
+                dict(name="testrpm-epoch", prefix="/app", epoch="1"),
+                dict(name="testrpm-usr", prefix="/usr"),
+            ]
+        )
 
     subprocess.check_call([
         "rpm", "--root", root, "-Uvh", testrpm, testrpm_epoch, testrpm_usr
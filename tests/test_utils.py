@@ -1,9 +1,12 @@
 import os
+import sys
 from unittest.mock import patch
 
 import pytest
 
-from flatpak_module_tools.utils import Arch, atomic_writer, _get_rpm_arch
+from flatpak_module_tools.utils import (
+    Arch, atomic_writer, rpm_name_only, _get_rpm_arch
+)
 
 
 def test_arch():
@@ -16,7 +19,12 @@ def test_arch():
     assert Arch.TESTARCH.rpm == "testarch_rpm"
 
     _get_rpm_arch.cache_clear()
-    with patch("subprocess.check_output", return_value="testarch_rpm"):
+    with patch("rpm.expandMacro", return_value="testarch_rpm"):
+        assert Arch() == Arch(rpm="testarch_rpm")
+
+    _get_rpm_arch.cache_clear()
+    with patch.dict(sys.modules, {"rpm": None}), \
+         patch("subprocess.check_output", return_value="testarch_rpm\n"):
         assert Arch() == Arch(rpm="testarch_rpm")
 
     _get_rpm_arch.cache_clear()
@@ -29,9 +37,11 @@ def test_arch():
 def test_atomic_writer_basic(tmp_path):
     output_path = str(tmp_path / 'out.json')
 
-    def expect(val):
+    def expect(val, mtime=None):
         with open(output_path, "rb") as f:
             assert f.read() == val
+            if mtime is not None:
+                assert os.fstat(f.fileno()).st_mtime == mtime
 
     with atomic_writer(output_path) as writer:
         writer.write("HELLO")
@@ -40,13 +50,17 @@ def test_atomic_writer_basic(tmp_path):
 
     with atomic_writer(output_path) as writer:
         writer.write("HELLO")
-    expect(b"HELLO")
-    assert os.stat(output_path).st_mtime == 42
+    expect(b"HELLO", mtime=42)
 
     with atomic_writer(output_path) as writer:
         writer.write("GOODBYE")
     expect(b"GOODBYE")
 
+    # Same size, different contents
+    with atomic_writer(output_path) as writer:
+        writer.write("GOODBOY")
+    expect(b"GOODBOY")
+
 
 def test_atomic_writer_write_failure(tmp_path):
     output_path = str(tmp_path / 'out.json')
@@ -57,3 +71,13 @@ def test_atomic_writer_write_failure(tmp_path):
             raise IOError()
 
     assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize('rpm_name,expected', [
+    ('glib2-2.78.0-1.fc39', 'glib2'),
+    ('python3-gobject-base-3.46.0-1.fc39', 'python3-gobject-base'),
+    ('glib2-2.78.0', 'glib2'),
+    ('glib2', 'glib2'),
+])
+def test_rpm_name_only(rpm_name, expected):
+    assert rpm_name_only(rpm_name) == expected